@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.agents.orchestrator import Shared, generate_ui_project, load_shared
+
+_PATH_KEYS = ("openapi", "wireframe", "org_theme", "output")
+
+@dataclass
+class JobResult:
+    name: str
+    output: str
+    ok: bool
+    seconds: float
+    files_written: int = 0
+    error: str = ""
+
+def load_batch_manifest(path: str) -> List[Dict[str, Any]]:
+    # Accepts a list of jobs, or {"defaults": {...}, "jobs": [...]}. Relative paths resolve against the manifest.
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        data = json.loads(text)
+    else:
+        import yaml
+
+        data = yaml.safe_load(text)
+    defaults: Dict[str, Any] = {}
+    if isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        data = data.get("jobs")
+    if not isinstance(data, list):
+        raise ValueError(f"Batch manifest {path} must be a list of jobs or contain a 'jobs' list")
+
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    # Jobs run concurrently; two writing one directory would interleave its files and build manifests.
+    outputs: Dict[str, int] = {}
+    for i, entry in enumerate(data):
+        job = {**defaults, **(entry or {})}
+        for k in _PATH_KEYS:
+            v = job.get(k)
+            if isinstance(v, str) and not v.startswith(("http://", "https://")) and not os.path.isabs(v):
+                job[k] = os.path.normpath(os.path.join(base, v))
+        if not job.get("output") or not job.get("org_theme"):
+            raise ValueError(f"Batch job #{i + 1} needs at least 'output' and 'org_theme'")
+        out = os.path.normcase(os.path.abspath(job["output"]))
+        if out in outputs:
+            raise ValueError(f"Batch jobs #{outputs[out]} and #{i + 1} both write to {job['output']}")
+        outputs[out] = i + 1
+        job.setdefault("name", job.get("app_name") or os.path.basename(job["output"].rstrip("/\\")))
+        jobs.append(job)
+    return jobs
+
+def run_batch(
+    manifest_path: str,
+    jobs: int = 4,
+    cache_dir: Optional[str] = None,
+    clean: bool = False,
+    max_workers: int = 4,
+    figma_token: Optional[str] = None,
+    coverage: str = "compact",
+) -> List[JobResult]:
+    entries = load_batch_manifest(manifest_path)
+    shared = load_shared(cache_dir)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="job") as pool:
+        results = list(pool.map(lambda job: _run_job(job, shared, cache_dir, clean, max_workers, figma_token, coverage), entries))
+    _print_summary(results, time.perf_counter() - t0, shared)
+    return results
+
+def _run_job(
+    job: Dict[str, Any],
+    shared: Shared,
+    cache_dir: Optional[str],
+    clean: bool,
+    max_workers: int,
+    figma_token: Optional[str],
+    coverage: str,
+) -> JobResult:
+    t0 = time.perf_counter()
+    try:
+        run = generate_ui_project(
+            openapi=job.get("openapi"),
+            wireframe=job.get("wireframe"),
+            figma_file_key=job.get("figma_file_key"),
+            figma_token=job.get("figma_token") or figma_token,
+            org_theme_path=job["org_theme"],
+            output_dir=job["output"],
+            app_name=job.get("app_name") or "GeneratedUI",
+            api_base_url=job.get("base_url") or "http://localhost:8080",
+            with_tests=bool(job.get("with_tests", False)),
+            cache_dir=cache_dir,
+            clean=clean,
+            max_workers=max_workers,
+            shared=shared,
+            coverage=job.get("coverage") or coverage,
+            verbose=False,
+        )
+    except Exception as e:
+        # Keep going: one broken spec must not sink the rest of the batch.
+        return JobResult(job["name"], job["output"], False, time.perf_counter() - t0, error=f"{type(e).__name__}: {e}")
+    stats = run.results["write"]
+    return JobResult(job["name"], job["output"], True, time.perf_counter() - t0, files_written=stats["written"])
+
+def _print_summary(results: List[JobResult], wall: float, shared: Shared) -> None:
+    width = max([len(r.name) for r in results] + [4])
+    for r in results:
+        if r.ok:
+            print(f"✅ {r.name:<{width}}  ok      {r.seconds:6.2f}s  {r.files_written} file(s) written -> {r.output}")
+        else:
+            print(f"❌ {r.name:<{width}}  failed  {r.seconds:6.2f}s  {r.error}")
+    ok = sum(1 for r in results if r.ok)
+    print(f"Batch: {ok} ok, {len(results) - ok} failed in {wall:.2f}s")
+    cache = getattr(shared.llm, "cache", None)
+    if cache is not None:
+        print(f"   LLM cache: {cache.hits} hit(s), {cache.misses} miss(es) [{cache.cache_dir}]")
@@ -1,22 +1,34 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
-from app.llm.provider import get_llm
+from app.llm.cache import CachedLLM, LLMCache
+from app.llm.provider import get_llm, llm_fingerprint, llm_identity
 from app.tools.openapi_loader import load_openapi
-from app.tools.figma_loader import load_figma_minimal
+from app.tools.openapi_index import OpenAPIIndex
+from app.tools.figma_loader import load_figma
 from app.tools.wireframe_loader import load_wireframe
 from app.tools.theme_loader import load_theme_tokens
+from app.tools import codegen_templates, tracing
 from app.tools.project_writer import write_react_project
+from app.tools.react_templates import TemplateSnapshot
 
+from app.agents.pipeline import BuildGraph, PipelineRun, Stage, StageMemo, json_digest, run_stages
 from app.agents.ui_spec_agent import build_ui_spec
-from app.agents.react_codegen_agent import generate_react_app
+from app.agents.react_codegen_agent import _theme_css, generate_react_app, theme_variables
 from app.agents.tests_agent import generate_playwright_tests
 from app.prompts.load_prompts import load_prompt_bundle
 
+# Persistent stage graph, next to the writer's manifest in the output directory.
+BUILD_GRAPH_NAME = ".ui-gen-build.json"
+# Stages whose results are stored in the graph; everything the write stage needs is among them.
+_PERSISTED_STAGES = ("theme_summary", "theme_vars", "theme_css", "ui_spec", "react", "tests")
+
 @dataclass
 class Inputs:
     openapi: Optional[str]
@@ -28,16 +40,97 @@ class Inputs:
     app_name: str
     api_base_url: str
     with_tests: bool
+    cache_dir: Optional[str] = None
+    clean: bool = False
+    max_workers: int = 4
+    coverage: str = "compact"
+
+@dataclass
+class Shared:
+    # Per-process resources reused across generations (batch/watch): prompts, LLM client, template snapshot.
+    prompts: Dict[str, str]
+    llm: Any
+    template: TemplateSnapshot
+
+def load_shared(cache_dir: Optional[str] = None) -> Shared:
+    return Shared(
+        prompts=load_prompt_bundle(),
+        llm=_make_llm(cache_dir),
+        template=TemplateSnapshot.load(),
+    )
 
 def _read_input_payload(inp: Inputs) -> Dict[str, Any]:
     if inp.wireframe:
         return {"kind": "wireframe", "data": load_wireframe(inp.wireframe)}
     if inp.openapi:
-        return {"kind": "openapi", "data": load_openapi(inp.openapi)}
+        return {"kind": "openapi", "data": _load_spec(inp)}
     if inp.figma_file_key and inp.figma_token:
-        return {"kind": "figma", "data": load_figma_minimal(inp.figma_file_key, inp.figma_token)}
+        figma = load_figma(
+            inp.figma_file_key,
+            inp.figma_token,
+            http_cache_dir=_cache_subdir(inp, "http"),
+            node_cache_dir=_cache_subdir(inp, "figma"),
+            max_workers=inp.max_workers,
+        )
+        return {"kind": "figma", "data": figma}
     raise ValueError("Provide one of: --wireframe, --openapi, or --figma-file-key + --figma-token")
 
+def _cache_subdir(inp: Inputs, name: str) -> Optional[str]:
+    return os.path.join(inp.cache_dir, name) if inp.cache_dir else None
+
+def _load_spec(inp: Inputs) -> Dict[str, Any]:
+    return load_openapi(inp.openapi, cache_dir=_cache_subdir(inp, "specs"), http_cache_dir=_cache_subdir(inp, "http"))
+
+def _build_openapi_index(inp: Inputs, source: Dict[str, Any]) -> Optional[OpenAPIIndex]:
+    # Built once per run and shared by every agent. A wireframe run can still point at a spec via --openapi.
+    if source["kind"] == "openapi":
+        return OpenAPIIndex(source["data"])
+    if inp.openapi:
+        return OpenAPIIndex(_load_spec(inp))
+    return None
+
+def _file_key(path: Optional[str]) -> Optional[str]:
+    # Memo input for a local file: (path, mtime, size). None for URLs, which must be re-fetched.
+    if not path:
+        return ""
+    if path.startswith(("http://", "https://")):
+        return None
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+
+def _source_key(inp: Inputs) -> Optional[str]:
+    if inp.wireframe:
+        return _file_key(inp.wireframe)
+    if inp.openapi:
+        return _file_key(inp.openapi)
+    return None
+
+def _theme_summary(theme: Dict[str, Any]) -> Dict[str, Any]:
+    # All the ui-spec and codegen stages read from the theme; tokens only reach theme.css.
+    return {"name": theme.get("name", "OrgTheme")}
+
+def open_build_graph(output_dir: str, fresh: bool = False) -> BuildGraph:
+    return BuildGraph(os.path.join(output_dir, BUILD_GRAPH_NAME), _generator_stamp(), persist=_PERSISTED_STAGES, fresh=fresh)
+
+@lru_cache(maxsize=None)
+def _generator_stamp() -> str:
+    # Code, prompts and templates of this generator: any edit (or upgrade) invalidates stored graphs.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for fn in sorted(filenames):
+            st = os.stat(os.path.join(dirpath, fn))
+            h.update(f"{os.path.relpath(os.path.join(dirpath, fn), root)}:{st.st_mtime_ns}:{st.st_size};".encode("utf-8"))
+    return h.hexdigest()
+
+def _make_llm(cache_dir: Optional[str]):
+    llm = get_llm()
+    if llm is not None and cache_dir:
+        provider, model = llm_identity()
+        llm = CachedLLM(llm, LLMCache(os.path.join(cache_dir, "llm")), provider=provider, model=model)
+    return llm
+
 def generate_ui_project(
     openapi: Optional[str],
     wireframe: Optional[str],
@@ -48,7 +141,16 @@ def generate_ui_project(
     app_name: str,
     api_base_url: str,
     with_tests: bool = False,
-) -> None:
+    cache_dir: Optional[str] = None,
+    clean: bool = False,
+    max_workers: int = 4,
+    shared: Optional[Shared] = None,
+    verbose: bool = True,
+    memo: Optional[StageMemo] = None,
+    coverage: str = "compact",
+) -> PipelineRun:
+    # Stages whose inputs are unchanged since the previous run into output_dir are reused from its build
+    # graph (watch mode passes one it keeps open). --clean starts from an empty graph.
     inp = Inputs(
         openapi=openapi,
         wireframe=wireframe,
@@ -59,32 +161,121 @@ def generate_ui_project(
         app_name=app_name,
         api_base_url=api_base_url,
         with_tests=with_tests,
+        cache_dir=cache_dir,
+        clean=clean,
+        max_workers=max_workers,
+        coverage=coverage,
     )
 
-    prompts = load_prompt_bundle()
-    llm = get_llm()
-
-    source_payload = _read_input_payload(inp)
-    theme = load_theme_tokens(inp.org_theme_path)
-    ui_spec = build_ui_spec(llm=llm, prompts=prompts, source_payload=source_payload, theme=theme, app_name=app_name)
-
-    # Generate the React project contents (file map)
-    file_map = generate_react_app(
-        llm=llm,
-        prompts=prompts,
-        ui_spec=ui_spec,
-        theme=theme,
-        app_name=app_name,
-        api_base_url=api_base_url,
-        with_tests=with_tests,
-    )
-
+    # Stage graph: independent stages (prompts/llm/source/theme, then react/tests) run concurrently.
+    # Theme tokens feed theme_css; ui_spec/react see the theme summary, and react also the names of the CSS
+    # variables (theme_vars). A token value edit re-renders theme.css alone (theme_css also reads react's
+    # output, which is reused); adding or removing a token re-runs react as well.
+    source_key = _source_key(inp)
+    # The index is built from the source itself unless a wireframe run points at a separate spec.
+    spec_key = _file_key(inp.openapi) if inp.wireframe else ""
+    # User template overrides (--template-dir) feed every stage that renders codegen templates.
+    templates_key = codegen_templates.overrides_fingerprint()
+    stages = [
+        # Prompts ship with the generator, so the graph stamp already covers them.
+        Stage("prompts", (lambda: shared.prompts) if shared else load_prompt_bundle, memo=True),
+        Stage(
+            "llm",
+            (lambda: shared.llm) if shared else (lambda: _make_llm(inp.cache_dir)),
+            inputs=json_digest(llm_fingerprint()),
+            memo=True,
+        ),
+        Stage("source", lambda: _read_input_payload(inp), inputs=source_key, memo=source_key is not None, digest=json_digest),
+        Stage("theme", lambda: load_theme_tokens(inp.org_theme_path), inputs=_file_key(inp.org_theme_path), memo=True, digest=json_digest),
+        Stage("theme_summary", _theme_summary, deps=("theme",), memo=True, digest=json_digest),
+        Stage("theme_vars", theme_variables, deps=("theme",), inputs=templates_key, memo=True, digest=json_digest),
+        Stage(
+            "openapi_index",
+            lambda source: _build_openapi_index(inp, source),
+            deps=("source",),
+            inputs=spec_key,
+            memo=spec_key is not None,
+        ),
+        Stage(
+            "ui_spec",
+            lambda llm, prompts, source, theme_summary, openapi_index: build_ui_spec(
+                llm=llm,
+                prompts=prompts,
+                source_payload=source,
+                theme=theme_summary,
+                app_name=app_name,
+                openapi_index=openapi_index,
+                coverage=inp.coverage,
+            ),
+            deps=("llm", "prompts", "source", "theme_summary", "openapi_index"),
+            inputs=json_digest([app_name, inp.coverage]),
+            memo=True,
+            digest=json_digest,
+        ),
+        Stage(
+            "react",
+            lambda llm, prompts, ui_spec, theme_summary, theme_vars, openapi_index: generate_react_app(
+                llm=llm,
+                prompts=prompts,
+                ui_spec=ui_spec,
+                theme=theme_summary,
+                app_name=app_name,
+                api_base_url=api_base_url,
+                with_tests=with_tests,
+                max_workers=inp.max_workers,
+                openapi_index=openapi_index,
+                emit_theme_css=False,
+                theme_vars=theme_vars,
+            ),
+            deps=("llm", "prompts", "ui_spec", "theme_summary", "theme_vars", "openapi_index"),
+            inputs=json_digest([app_name, api_base_url, templates_key]),
+            memo=True,
+            digest=json_digest,
+        ),
+        # theme.css keeps only the rules whose classes the generated files use, so it follows codegen.
+        Stage("theme_css", lambda theme, react: _theme_css(theme, react), deps=("theme", "react"), inputs=templates_key, memo=True),
+    ]
+    write_deps = ("ui_spec", "react", "theme_css")
     if with_tests:
-        test_files = generate_playwright_tests(llm=llm, prompts=prompts, ui_spec=ui_spec, app_name=app_name)
-        file_map.update(test_files)
+        stages.append(Stage(
+            "tests",
+            lambda llm, prompts, ui_spec: generate_playwright_tests(llm=llm, prompts=prompts, ui_spec=ui_spec, app_name=app_name),
+            deps=("llm", "prompts", "ui_spec"),
+            inputs=app_name,
+            memo=True,
+            digest=json_digest,
+        ))
+        write_deps += ("tests",)
 
     # Write output (React Vite template + generated files)
-    write_react_project(output_dir=output_dir, app_name=app_name, file_map=file_map, ui_spec=ui_spec)
+    def _write(ui_spec, react, theme_css, tests=None):
+        file_map = dict(react)
+        file_map["src/styles/theme.css"] = theme_css
+        file_map.update(tests or {})
+        return write_react_project(
+            output_dir=output_dir,
+            app_name=app_name,
+            file_map=file_map,
+            ui_spec=ui_spec,
+            incremental=not inp.clean,
+            template=shared.template if shared else None,
+        )
+    stages.append(Stage("write", _write, deps=write_deps))
 
-    print(f"✅ Generated React app at: {output_dir}")
-    print(f"   Next: cd {output_dir} && npm install && npm run dev")
+    if memo is None:
+        memo = open_build_graph(output_dir, fresh=inp.clean)
+    with tracing.span("generate", cat="run", app=app_name, output=output_dir):
+        run = run_stages(stages, max_workers=inp.max_workers, memo=memo)
+    if isinstance(memo, BuildGraph):
+        memo.save()
+    if verbose:
+        stats = run.results["write"]
+        # A reused llm stage means no LLM call was made this run.
+        cache = getattr(run.results.get("llm"), "cache", None)
+        print(f"✅ Generated React app at: {output_dir}")
+        print(f"   Files: {stats['written']} written, {stats['unchanged']} unchanged, {stats['deleted']} removed")
+        print(f"   Stages: {run.summary()}")
+        print(f"   Next: cd {output_dir} && npm install && npm run dev")
+        if cache is not None:
+            print(f"   LLM cache: {cache.hits} hit(s), {cache.misses} miss(es) [{cache.cache_dir}]")
+    return run
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.tools import tracing
+
+@dataclass
+class Stage:
+    name: str
+    # Called with the results of `deps` as keyword arguments.
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    # Memoization (only used when run_stages gets a memo). A stage's key hashes `inputs` (external inputs
+    # such as a file's path/mtime/size) with the fingerprints of its deps; with `memo`, an unchanged key
+    # reuses the stored result. The stage's own fingerprint is `digest(result)` when given, so dependents
+    # only re-run when the output actually changed; otherwise the key (memo stages) or a fresh token.
+    inputs: Optional[str] = None
+    memo: bool = False
+    digest: Optional[Callable[[Any], str]] = None
+
+# Returned by a memo in place of the result when only the stage's key/fingerprint was kept.
+NOT_STORED = object()
+
+class StageMemo:
+    # In-process store of the last result per stage (watch mode keeps one across regenerations).
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[str, Any, str]] = {}
+
+    def get(self, name: str, key: str) -> Optional[Tuple[Any, str]]:
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != key:
+            return None
+        return entry[1], entry[2]
+
+    def put(self, name: str, key: str, result: Any, fingerprint: str) -> None:
+        self._entries[name] = (key, result, fingerprint)
+
+class BuildGraph(StageMemo):
+    # StageMemo persisted in the output directory. Every memo stage's key and fingerprint are recorded;
+    # results are stored only for stages in `persist` (JSON-serializable outputs such as the ui-spec and
+    # generated file maps). The others come back as NOT_STORED: enough to reuse their dependents, and
+    # run_stages re-runs them only if a dependent that does run needs the actual value. `stamp`
+    # identifies the generator build; a graph written by a different one is ignored.
+
+    def __init__(self, path: str, stamp: str, persist: Tuple[str, ...] = (), fresh: bool = False):
+        super().__init__()
+        self.path = path
+        self.stamp = stamp
+        self.persist = persist
+        self._stored: Dict[str, Dict[str, Any]] = {}
+        if fresh:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get("stamp") == stamp:
+                self._stored = data.get("stages") or {}
+        except (OSError, ValueError):
+            pass
+
+    def get(self, name: str, key: str) -> Optional[Tuple[Any, str]]:
+        hit = super().get(name, key)
+        if hit is not None:
+            return hit
+        entry = self._stored.get(name)
+        if not entry or entry.get("key") != key:
+            return None
+        return entry.get("result", NOT_STORED), entry["fingerprint"]
+
+    def put(self, name: str, key: str, result: Any, fingerprint: str) -> None:
+        super().put(name, key, result, fingerprint)
+        entry: Dict[str, Any] = {"key": key, "fingerprint": fingerprint}
+        if name in self.persist:
+            entry["result"] = result
+        self._stored[name] = entry
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"stamp": self.stamp, "stages": self._stored}, f)
+        os.replace(tmp, self.path)
+
+def json_digest(obj: Any) -> str:
+    blob = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+@dataclass
+class StageTiming:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+@dataclass
+class PipelineRun:
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    wall: float = 0.0
+    # Stages whose result came from the memo instead of running.
+    skipped: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        parts = [f"{name} {t.duration:.2f}s" for name, t in sorted(self.timings.items(), key=lambda kv: kv[1].start)]
+        serial = sum(t.duration for t in self.timings.values())
+        reused = f", reused: {', '.join(self.skipped)}" if self.skipped else ""
+        return f"{', '.join(parts)} (wall {self.wall:.2f}s vs {serial:.2f}s serial{reused})"
+
+def run_stages(stages: List[Stage], max_workers: int = 4, memo: Optional[StageMemo] = None) -> PipelineRun:
+    # Runs each stage as soon as all of its deps have finished; independent stages overlap on the pool.
+    # With a memo, a stage is looked up as soon as its deps' fingerprints are known and reused on a hit.
+    # A reused stage whose result was not kept (NOT_STORED) only runs if a stage that does run needs it.
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{s.name}' depends on unknown stage(s): {missing}")
+    order = _topological(stages)
+
+    run = PipelineRun()
+    fingerprints: Dict[str, str] = {}
+    undecided = [st.name for st in order]
+    reused: List[str] = []
+    to_run: List[str] = []
+    running: Dict[Future, str] = {}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="stage") as pool:
+        while True:
+            progress = True
+            while progress:
+                progress = False
+                for name in [n for n in undecided if all(d in fingerprints for d in by_name[n].deps)]:
+                    undecided.remove(name)
+                    progress = True
+                    st = by_name[name]
+                    hit = memo.get(name, _stage_key(st, fingerprints)) if memo is not None and st.memo else None
+                    if hit is None:
+                        to_run.append(name)
+                        continue
+                    result, fingerprints[name] = hit
+                    reused.append(name)
+                    if result is not NOT_STORED:
+                        run.results[name] = result
+                # A stage that runs needs real results from its deps: materialize reused ones that weren't kept.
+                for name in list(to_run):
+                    for d in by_name[name].deps:
+                        if d in reused and d not in run.results:
+                            reused.remove(d)
+                            to_run.append(d)
+                            progress = True
+            for name in [n for n in to_run if all(d in run.results for d in by_name[n].deps)]:
+                to_run.remove(name)
+                kwargs = {d: run.results[d] for d in by_name[name].deps}
+                running[pool.submit(_timed, name, by_name[name].fn, kwargs, t0)] = name
+            if not running:
+                if undecided or to_run:
+                    raise RuntimeError(f"Stages cannot be scheduled: {undecided + to_run}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                st = by_name[name]
+                run.results[name], run.timings[name] = fut.result()
+                if memo is None:
+                    fingerprints[name] = ""
+                    continue
+                key = _stage_key(st, fingerprints)
+                fingerprints[name] = _fingerprint(st, key, run.results[name])
+                if st.memo:
+                    memo.put(name, key, run.results[name], fingerprints[name])
+    run.skipped = [n for n in (st.name for st in order) if n in reused]
+    run.wall = time.perf_counter() - t0
+    return run
+
+def _topological(stages: List[Stage]) -> List[Stage]:
+    done: Dict[str, Stage] = {}
+    remaining = list(stages)
+    while remaining:
+        ready = [st for st in remaining if all(d in done for d in st.deps)]
+        if not ready:
+            raise ValueError(f"Stage dependency cycle among: {sorted(st.name for st in remaining)}")
+        for st in ready:
+            done[st.name] = st
+            remaining.remove(st)
+    return list(done.values())
+
+def _stage_key(st: Stage, fingerprints: Dict[str, str]) -> str:
+    return json_digest([st.name, st.inputs, [(d, fingerprints[d]) for d in st.deps]])
+
+def _fingerprint(st: Stage, key: str, result: Any) -> str:
+    if st.digest is not None:
+        return st.digest(result)
+    # Without a digest, a stage that always runs must not let its dependents be reused.
+    return key if st.memo else uuid.uuid4().hex
+
+def _timed(name: str, fn: Callable[..., Any], kwargs: Dict[str, Any], t0: float) -> Tuple[Any, StageTiming]:
+    start = time.perf_counter() - t0
+    with tracing.span(name, cat="stage"):
+        result = tracing.profile_call(fn, kwargs)
+    return result, StageTiming(start=start, end=time.perf_counter() - t0)
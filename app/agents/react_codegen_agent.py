@@ -1,9 +1,17 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
 
-from app.tools.react_templates import base_vite_template_files, materialize_routes, infer_openapi_operations
+from app.llm.cache import commit_reply
+from app.tools import tracing
+from app.tools.openapi_index import OpenAPIIndex
+from app.tools.react_templates import base_vite_template_files, materialize_routes, infer_openapi_operations, page_component_name
+from app.tools.theme_compiler import compile_theme_css, used_classes_of
+
+UNIT_RETRIES = 1
 
 def generate_react_app(
     llm,
@@ -13,214 +21,147 @@ def generate_react_app(
     app_name: str,
     api_base_url: str,
     with_tests: bool,
+    max_workers: int = 4,
+    openapi_index: Optional[OpenAPIIndex] = None,
+    emit_theme_css: bool = True,
+    theme_vars: Optional[List[str]] = None,
 ) -> Dict[str, str]:
+    # With emit_theme_css=False, theme.css is left to the caller (the orchestrator renders it in its own
+    # stage so token edits don't invalidate codegen); `theme` is then only read for its name, and the
+    # CSS variables the LLM may use come from `theme_vars` (theme_variables() of the full theme).
     # Start from deterministic template + inferred routes.
     file_map: Dict[str, str] = {}
     file_map.update(base_vite_template_files(app_name=app_name))
-    file_map.update(materialize_routes(ui_spec=ui_spec))
+    file_map.update(materialize_routes(ui_spec=ui_spec, openapi_index=openapi_index))
 
     # Generate OpenAPI operation map if source is openapi OR wireframe uses openapi sources
-    ops = infer_openapi_operations(ui_spec)
+    ops = infer_openapi_operations(ui_spec, openapi_index)
     file_map["src/api/operations.ts"] = ops["operations_ts"]
     file_map["src/api/types.ts"] = ops["types_ts"]
     file_map["src/api/http.ts"] = ops["http_ts"].replace("__API_BASE_URL__", api_base_url)
+    file_map["src/api/paging.ts"] = ops["paging_ts"]
+    file_map["src/generated/opmap.ts"] = ops["opmap_ts"]
+    file_map["src/api/forms.ts"] = ops["forms_ts"]
 
     # Theme tokens -> theme.css
-    file_map["src/styles/theme.css"] = _theme_css(theme)
+    if emit_theme_css:
+        file_map["src/styles/theme.css"] = _theme_css(theme, file_map)
 
     # If no LLM, done.
     if llm is None:
         file_map["GENERATED_NOTES.md"] = _notes(ui_spec, theme, llm_enabled=False)
         return file_map
 
-    # LLM pass: improve layout + copy, without changing build config
-    system = prompts["system"]
-    skills = prompts["skills"]
+    # LLM pass: improve layout + copy, without changing build config.
+    # One small request per file (pages, home, nav) instead of one giant JSON file map, so a truncated
+    # or malformed reply costs a single retry of that file rather than the whole pass.
+    system = prompts["system"] + "\n\n" + prompts["skills"]
     react_prompt = prompts["react_codegen_prompt"]
-
-    req = {
-        "ui_spec": ui_spec,
-        "theme_tokens": theme,
-        "api_base_url": api_base_url,
-        "constraints": {
-            "vite_ts": True,
-            "no_inline_styles": True,
-            "prefer_small_components": True,
-            "a11y": True,
-        },
-        "current_files_index": sorted(list(file_map.keys())),
-        "instructions": "Return a JSON object mapping file paths to full file contents. Only include files you want to add/replace."
-    }
-
-    msg = f"""{react_prompt}
+    if theme_vars is None:
+        theme_vars = theme_variables(theme)
+    files_index = sorted(set(file_map) | {"src/styles/theme.css"})
+
+    units: Dict[str, Any] = {}
+    for pg in ui_spec.get("pages", []) or []:
+        units.setdefault(f"src/pages/{page_component_name(pg)}.tsx", pg)
+    units["src/pages/HomePage.tsx"] = None
+    units["src/components/Nav.tsx"] = None
+
+    def _unit_messages(path: str, page, attempt: int):
+        req = {
+            "target_file": path,
+            "current_content": file_map.get(path, ""),
+            "page": page,
+            "app_name": app_name,
+            "routes": [{"name": p.get("name"), "route": p.get("route")} for p in ui_spec.get("pages", []) or []],
+            "theme_css_variables": theme_vars,
+            "api_base_url": api_base_url,
+            "constraints": {
+                "vite_ts": True,
+                "no_inline_styles": True,
+                "prefer_small_components": True,
+                "a11y": True,
+            },
+            "current_files_index": files_index,
+            "instructions": "Return ONLY the full contents of target_file. No JSON wrapper, no markdown fences.",
+        }
+        if attempt:
+            # Also changes the cache key, so a retry never replays the cached incomplete reply.
+            req["retry"] = f"Attempt {attempt + 1}: the previous reply was incomplete. Return the complete file."
+        msg = f"""{react_prompt}
 
 # INPUT (JSON)
 {json.dumps(req, indent=2)}
 """
-
-    try:
-        resp = llm.invoke([
-            {"role":"system","content": system + "\n\n" + skills},
+        return [
+            {"role":"system","content": system},
             {"role":"user","content": msg},
-        ])
-        text = getattr(resp, "content", None) or str(resp)
-        patch = json.loads(_extract_json(text))
-        if isinstance(patch, dict):
-            for k,v in patch.items():
-                if isinstance(k, str) and isinstance(v, str):
-                    file_map[k] = v
-    except Exception:
-        pass
-
+        ]
+
+    def _generate_unit(path: str, page) -> Optional[str]:
+        for attempt in range(1 + UNIT_RETRIES):
+            messages = _unit_messages(path, page, attempt)
+            with tracing.span("llm.codegen_unit", cat="llm", file=path, attempt=attempt):
+                try:
+                    content = _strip_fences(_stream_text(llm, messages))
+                except Exception:
+                    continue
+                ok = _looks_like_module(content)
+                tracing.annotate(response_chars=len(content), complete=ok)
+            if ok:
+                commit_reply(llm, messages)
+                return content
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="codegen") as pool:
+        futures = {pool.submit(_generate_unit, path, page): path for path, page in units.items()}
+        for fut in as_completed(futures):
+            # Commit each file as soon as its unit finishes; failed units keep the deterministic baseline.
+            content = fut.result()
+            if content is not None:
+                file_map[futures[fut]] = content
+
+    if emit_theme_css:
+        # Rewritten pages may use classes the baseline didn't.
+        file_map["src/styles/theme.css"] = _theme_css(theme, file_map)
     file_map["GENERATED_NOTES.md"] = _notes(ui_spec, theme, llm_enabled=True)
     return file_map
 
-def _extract_json(text: str) -> str:
-    start = text.find("{")
-    end = text.rfind("}")
-    if start >= 0 and end > start:
-        return text[start:end+1]
-    raise ValueError("No JSON found")
-
-def _theme_css(theme: Dict[str, Any]) -> str:
-    tokens = theme.get("tokens", {})
-    colors = tokens.get("colors", {})
-    typography = tokens.get("typography", {})
-    radius = tokens.get("radius", {})
-    spacing = tokens.get("spacing", {})
-
-    # minimal CSS variables
-    def g(d, k, default):
-        return d.get(k, default) if isinstance(d, dict) else default
-
-    return f"""/* Generated from org-theme.json */
-:root {{
-  --brand-primary: {g(colors,'primary','#2f6fed')};
-  --brand-secondary: {g(colors,'secondary','#6b7280')};
-  --brand-accent: {g(colors,'accent','#10b981')};
-  --bg: {g(colors,'background','#0b1220')};
-  --surface: {g(colors,'surface','#111827')};
-  --text: {g(colors,'text','#e5e7eb')};
-  --muted: {g(colors,'muted','#9ca3af')};
-  --border: {g(colors,'border','#1f2937')};
-  --danger: {g(colors,'danger','#ef4444')};
-
-  --font-sans: {g(typography,'fontFamily','ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto')};
-  --font-mono: {g(typography,'monoFamily','ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas')};
-  --base-size: {g(typography,'baseSize','16px')};
-
-  --radius-sm: {g(radius,'sm','8px')};
-  --radius-md: {g(radius,'md','14px')};
-  --radius-lg: {g(radius,'lg','18px')};
-
-  --space-2: {g(spacing,'2','8px')};
-  --space-3: {g(spacing,'3','12px')};
-  --space-4: {g(spacing,'4','16px')};
-  --space-6: {g(spacing,'6','24px')};
-}}
-
-html, body {{
-  height: 100%;
-}}
-
-body {{
-  margin: 0;
-  font-family: var(--font-sans);
-  font-size: var(--base-size);
-  background: var(--bg);
-  color: var(--text);
-}}
-
-a {{
-  color: inherit;
-}}
-
-.container {{
-  max-width: 1120px;
-  margin: 0 auto;
-  padding: var(--space-6);
-}}
-
-.card {{
-  background: color-mix(in oklab, var(--surface) 92%, black 8%);
-  border: 1px solid var(--border);
-  border-radius: var(--radius-lg);
-  padding: var(--space-6);
-  box-shadow: 0 10px 25px rgba(0,0,0,.25);
-}}
-
-.btn {{
-  display: inline-flex;
-  align-items: center;
-  justify-content: center;
-  gap: 8px;
-  padding: 10px 14px;
-  border-radius: var(--radius-md);
-  border: 1px solid var(--border);
-  background: var(--brand-primary);
-  color: white;
-  font-weight: 600;
-  cursor: pointer;
-}}
-
-.btn.secondary {{
-  background: transparent;
-  color: var(--text);
-}}
-
-.input, select, textarea {{
-  width: 100%;
-  padding: 10px 12px;
-  border-radius: var(--radius-md);
-  border: 1px solid var(--border);
-  background: color-mix(in oklab, var(--surface) 85%, black 15%);
-  color: var(--text);
-}}
-
-.label {{
-  display: block;
-  color: var(--muted);
-  font-size: 13px;
-  margin-bottom: 6px;
-}}
-
-.grid {{
-  display: grid;
-  gap: var(--space-4);
-}}
-
-.grid.two {{
-  grid-template-columns: repeat(2, minmax(0, 1fr));
-}}
-
-.nav {{
-  display: flex;
-  align-items: center;
-  justify-content: space-between;
-  gap: var(--space-4);
-  padding: var(--space-4) 0;
-}}
-
-.navlinks {{
-  display: flex;
-  gap: 10px;
-  flex-wrap: wrap;
-}}
-
-.pill {{
-  padding: 8px 10px;
-  border-radius: 999px;
-  border: 1px solid var(--border);
-  text-decoration: none;
-  color: var(--text);
-  background: transparent;
-}}
-
-.pill.active {{
-  background: color-mix(in oklab, var(--brand-primary) 30%, transparent 70%);
-  border-color: color-mix(in oklab, var(--brand-primary) 40%, var(--border) 60%);
-}}
-"""
+def _stream_text(llm, messages) -> str:
+    if not hasattr(llm, "stream"):
+        resp = llm.invoke(messages)
+        tracing.record_llm_usage(resp)
+        return getattr(resp, "content", None) or str(resp)
+    parts = []
+    for chunk in llm.stream(messages):
+        tracing.record_llm_usage(chunk)
+        piece = getattr(chunk, "content", None)
+        if isinstance(piece, str):
+            parts.append(piece)
+    return "".join(parts)
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip() + "\n"
+
+def _looks_like_module(text: str) -> bool:
+    # Cheap completeness check: a truncated stream rarely ends with balanced braces.
+    return "export" in text and text.count("{") == text.count("}")
+
+def theme_variables(theme: Dict[str, Any]) -> List[str]:
+    # Every CSS variable theme.css declares for this theme, org tokens included.
+    return sorted(set(re.findall(r"(--[\w-]+)\s*:", _theme_css(theme))))
+
+def _theme_css(theme: Dict[str, Any], file_map: Optional[Dict[str, str]] = None) -> str:
+    # With the app's generated files, utility rules they never reference are left out of theme.css.
+    if file_map is None:
+        return compile_theme_css(theme)
+    key, used = used_classes_of(file_map)
+    return compile_theme_css(theme, used, classes_key=key)
 
 def _notes(ui_spec: Dict[str, Any], theme: Dict[str, Any], llm_enabled: bool) -> str:
     return f"""# Generated UI Notes
@@ -3,6 +3,9 @@ from __future__ import annotations
 import json
 from typing import Dict, Any
 
+from app.llm.cache import commit_reply
+from app.tools import tracing
+
 def generate_playwright_tests(llm, prompts: Dict[str,str], ui_spec: Dict[str, Any], app_name: str) -> Dict[str, str]:
     # Default: simple smoke tests (no LLM required)
     baseline = {
@@ -32,14 +35,20 @@ def generate_playwright_tests(llm, prompts: Dict[str,str], ui_spec: Dict[str, An
 {json.dumps(req, indent=2)}
 """
 
+    messages = [
+        {"role":"system","content": system + "\n\n" + skills},
+        {"role":"user","content": msg},
+    ]
     try:
-        resp = llm.invoke([
-            {"role":"system","content": system + "\n\n" + skills},
-            {"role":"user","content": msg},
-        ])
-        text = getattr(resp, "content", None) or str(resp)
-        patch = json.loads(_extract_json(text))
+        with tracing.span("llm.playwright_tests", cat="llm", prompt_chars=len(msg)):
+            resp = llm.invoke(messages)
+            tracing.record_llm_usage(resp)
+            text = getattr(resp, "content", None) or str(resp)
+            tracing.annotate(response_chars=len(text))
+        with tracing.span("parse.tests_json", cat="parse"):
+            patch = json.loads(_extract_json(text))
         if isinstance(patch, dict):
+            commit_reply(llm, messages)
             for k,v in patch.items():
                 if isinstance(k, str) and isinstance(v, str):
                     baseline[k] = v
@@ -56,12 +65,16 @@ def _extract_json(text: str) -> str:
     raise ValueError("No JSON found")
 
 def _baseline_smoke(ui_spec: Dict[str, Any]) -> str:
-    pages = ui_spec.get("pages", [])
+    # One check per page group (OpenAPI tag in full coverage), so large apps stay quick to smoke-test.
     checks = []
-    for pg in pages[:6]:
+    groups = set()
+    for pg in ui_spec.get("pages", []) or []:
         route = pg.get("route","/")
         name = pg.get("name","Page")
-        checks.append((name, route))
+        group = pg.get("group") or name
+        if group not in groups:
+            groups.add(group)
+            checks.append((name, route))
 
     lines = [
         "import { test, expect } from '@playwright/test';",
@@ -77,8 +90,8 @@ def _baseline_smoke(ui_spec: Dict[str, Any]) -> str:
             continue
         lines += [
             "",
-            f"  test('{name} page loads', async ({{ page }}) => {{",
-            f"    await page.goto('{route}');",
+            f"  test({json.dumps(name + ' page loads')}, async ({{ page }}) => {{",
+            f"    await page.goto({json.dumps(route)});",
             "    await expect(page.getByRole('heading', { level: 1 })).toBeVisible();",
             "  });",
         ]
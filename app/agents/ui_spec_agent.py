@@ -1,9 +1,28 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, Any
+import os
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
 
-def _baseline_ui_spec(source_payload: Dict[str, Any], theme: Dict[str, Any], app_name: str) -> Dict[str, Any]:
+from app.llm.cache import commit_reply
+from app.tools import tracing
+from app.tools.openapi_index import OpenAPIIndex, Operation
+from app.tools.payload_reducer import compact_json, estimate_tokens, reduce_ui_spec_payload
+from app.tools.react_templates import page_component_name
+
+# "compact" keeps the baseline small for LLM refinement (first 8 tags, 6 operations each); "full" covers
+# every tag and operation, splitting large tags into sub-pages.
+COVERAGE_MODES = ("compact", "full")
+COMPACT_MAX_PAGES = 8
+MAX_SECTIONS_PER_PAGE = 6
+
+def _baseline_ui_spec(
+    source_payload: Dict[str, Any],
+    theme: Dict[str, Any],
+    app_name: str,
+    openapi_index: Optional[OpenAPIIndex] = None,
+    coverage: str = "compact",
+) -> Dict[str, Any]:
     kind = source_payload["kind"]
     data = source_payload["data"]
 
@@ -13,37 +32,18 @@ def _baseline_ui_spec(source_payload: Dict[str, Any], theme: Dict[str, Any], app
         pages = data.get("pages", [])
     elif kind == "openapi":
         # infer resource groups from tags
-        paths = data.get("paths", {}) or {}
-        tags = {}
-        for pth, ops in paths.items():
-            if not isinstance(ops, dict):
-                continue
-            for method, op in ops.items():
-                if method.lower() not in ("get","post","put","patch","delete"):
-                    continue
-                t = (op or {}).get("tags") or ["API"]
-                for tag in t:
-                    tags.setdefault(tag, []).append({"path": pth, "method": method.lower(), "operation": op or {}})
-        # create a page per tag
-        for tag, items in list(tags.items())[:8]:
-            # choose up to 6 operations
-            sections = []
-            for it in items[:6]:
-                op = it["operation"]
-                op_id = op.get("operationId") or f"{it['method']}_{it['path'].strip('/').replace('/','_')}"
-                title = op.get("summary") or op_id
-                if it["method"] == "get":
-                    sections.append({"type": "table", "title": title, "source": {"kind": "openapi", "operationId": op_id}})
-                else:
-                    sections.append({"type": "form", "title": title, "source": {"kind": "openapi", "operationId": op_id}})
-            pages.append({"name": tag, "route": f"/{tag.lower().replace(' ','-')}", "sections": sections})
+        index = openapi_index or OpenAPIIndex(data)
+        pages = _openapi_pages(index, coverage)
         if not pages:
             pages = [{"name": "API", "route": "/api", "sections": [{"type":"table","title":"Operations","source":{"kind":"openapi","operationId":"__all__"}}]}]
     elif kind == "figma":
-        # minimal: each figma page becomes a route
+        # each figma page becomes a route; each top-level frame a layout section
         fig_pages = data.get("pages", [])
-        for pg in fig_pages[:8]:
-            pages.append({"name": pg.get("name","Page"), "route": f"/{pg.get('name','page').lower().replace(' ','-')}", "sections":[{"type":"layout","title":pg.get("name","Page"),"source":{"kind":"figma","nodeId":pg.get("id")}}]})
+        for pg in fig_pages if coverage == "full" else fig_pages[:COMPACT_MAX_PAGES]:
+            sections = [_figma_section(fr) for fr in (pg.get("frames") or [])]
+            if not sections:
+                sections = [{"type":"layout","title":pg.get("name","Page"),"source":{"kind":"figma","nodeId":pg.get("id")}}]
+            pages.append({"name": pg.get("name","Page"), "route": f"/{pg.get('name','page').lower().replace(' ','-')}", "sections": sections})
         if not pages:
             pages = [{"name":"Home","route":"/","sections":[{"type":"layout","title":"Home","source":{"kind":"figma","nodeId":"root"}}]}]
 
@@ -54,8 +54,90 @@ def _baseline_ui_spec(source_payload: Dict[str, Any], theme: Dict[str, Any], app
         "pages": pages,
     }
 
-def build_ui_spec(llm, prompts: Dict[str,str], source_payload: Dict[str, Any], theme: Dict[str, Any], app_name: str) -> Dict[str, Any]:
-    baseline = _baseline_ui_spec(source_payload, theme, app_name)
+def _openapi_pages(index: OpenAPIIndex, coverage: str) -> List[Dict[str, Any]]:
+    if coverage not in COVERAGE_MODES:
+        raise ValueError(f"Unknown coverage mode {coverage!r}; expected one of {COVERAGE_MODES}")
+    pages: List[Dict[str, Any]] = []
+    names: Set[str] = {_page_key("Home")}  # src/pages/HomePage.tsx is the index page
+    routes: Set[str] = set()
+    if coverage == "compact":
+        # create a page per tag, for the first tags and operations only
+        for tag, items in list(index.by_tag.items())[:COMPACT_MAX_PAGES]:
+            pages.append({
+                "name": _unique(tag, names, _page_key),
+                "route": _unique(_slug_route(tag), routes),
+                "sections": [_op_section(op) for op in items[:MAX_SECTIONS_PER_PAGE]],
+            })
+        return pages
+
+    # Every tag and operation. A tag with more operations than fit on a page is split into sub-pages by
+    # the first path segment below the tag's common prefix (/users/{id}/roles -> "roles"), and a
+    # sub-page that is still too large into numbered parts. Pages carry their tag as "group" for the nav.
+    for tag, items in index.by_tag.items():
+        base = _slug_route(tag)
+        groups = [("", items)] if len(items) <= MAX_SECTIONS_PER_PAGE else _split_by_prefix(items)
+        for prefix, ops in groups:
+            name = f"{tag} {prefix}" if prefix else tag
+            route = f"{base}/{_slug_route(prefix)[1:]}" if prefix else base
+            for start in range(0, len(ops), MAX_SECTIONS_PER_PAGE):
+                part = start // MAX_SECTIONS_PER_PAGE
+                pages.append({
+                    "name": _unique(f"{name} ({part + 1})" if part else name, names, _page_key),
+                    "route": _unique(f"{route}-{part + 1}" if part else route, routes),
+                    "group": tag,
+                    "sections": [_op_section(op) for op in ops[start:start + MAX_SECTIONS_PER_PAGE]],
+                })
+    return pages
+
+def _split_by_prefix(items: List[Operation]) -> List[Tuple[str, List[Operation]]]:
+    # Static path segments only: /pets/{id} and /pets share the "" (tag root) group.
+    segments = [[s for s in op.path.strip("/").split("/") if s and not s.startswith("{")] for op in items]
+    common = len(os.path.commonprefix(segments))
+    groups: Dict[str, List[Operation]] = {}
+    for op, segs in zip(items, segments):
+        groups.setdefault(segs[common] if len(segs) > common else "", []).append(op)
+    return list(groups.items())
+
+def _op_section(op: Operation) -> Dict[str, Any]:
+    title = op.summary or op.operation_id
+    kind = "table" if op.method == "get" else "form"
+    return {"type": kind, "title": title, "source": {"kind": "openapi", "operationId": op.operation_id}}
+
+def _slug_route(name: str) -> str:
+    return f"/{name.lower().replace(' ','-')}"
+
+def _unique(value: str, seen: Set[str], key: Callable[[str], str] = str.lower) -> str:
+    # Two tags or prefixes can map to the same route or component name; suffix the later ones.
+    candidate, n = value, 2
+    while key(candidate) in seen:
+        candidate, n = f"{value}-{n}", n + 1
+    seen.add(key(candidate))
+    return candidate
+
+def _page_key(name: str) -> str:
+    # Each page is written to src/pages/<component>.tsx, so names are distinct only if their components are
+    # ("Users-Roles" and "Users roles" are both UsersRolesPage).
+    return page_component_name({"name": name}).lower()
+
+def _figma_section(frame: Dict[str, Any]) -> Dict[str, Any]:
+    section: Dict[str, Any] = {"type": "layout", "title": frame.get("name") or "Section", "source": {"kind": "figma", "nodeId": frame.get("id")}}
+    node = frame.get("node") or {}
+    if node.get("texts"):
+        section["content"] = node["texts"]
+    if node.get("layout"):
+        section["layout"] = node["layout"]
+    return section
+
+def build_ui_spec(
+    llm,
+    prompts: Dict[str,str],
+    source_payload: Dict[str, Any],
+    theme: Dict[str, Any],
+    app_name: str,
+    openapi_index: Optional[OpenAPIIndex] = None,
+    coverage: str = "compact",
+) -> Dict[str, Any]:
+    baseline = _baseline_ui_spec(source_payload, theme, app_name, openapi_index=openapi_index, coverage=coverage)
 
     # If no LLM, return baseline
     if llm is None:
@@ -66,26 +148,34 @@ def build_ui_spec(llm, prompts: Dict[str,str], source_payload: Dict[str, Any], t
     skills = prompts["skills"]
     ui_spec_prompt = prompts["ui_spec_prompt"]
 
-    payload = {
-        "baseline": baseline,
-        "source_payload": source_payload,
-        "theme_tokens": theme,
-    }
+    # Prune the raw source (unused operations/schemas, examples, long descriptions) and serialize compactly.
+    payload = reduce_ui_spec_payload(baseline, source_payload, theme)
+    payload_json = compact_json(payload)
 
     msg = f"""{ui_spec_prompt}
 
 # INPUT (JSON)
-{json.dumps(payload, indent=2)}
+{payload_json}
 """
 
+    messages = [
+        {"role":"system","content": system + "\n\n" + skills},
+        {"role":"user","content": msg},
+    ]
     try:
-        resp = llm.invoke([
-            {"role":"system","content": system + "\n\n" + skills},
-            {"role":"user","content": msg},
-        ])
-        text = getattr(resp, "content", None) or str(resp)
+        with tracing.span("llm.ui_spec", cat="llm", prompt_chars=len(msg)):
+            if tracing.enabled():
+                # What pruning saved; the unpruned payload is only serialized when a trace is recorded.
+                unpruned = compact_json({"baseline": baseline, "source_payload": source_payload, "theme_tokens": theme})
+                tracing.annotate(payload_tokens=estimate_tokens(payload_json), unpruned_tokens=estimate_tokens(unpruned))
+            resp = llm.invoke(messages)
+            tracing.record_llm_usage(resp)
+            text = getattr(resp, "content", None) or str(resp)
+            tracing.annotate(response_chars=len(text))
         # Expect a JSON object in the output
-        ui_spec = json.loads(_extract_json(text))
+        with tracing.span("parse.ui_spec_json", cat="parse"):
+            ui_spec = json.loads(_extract_json(text))
+        commit_reply(llm, messages)
         return ui_spec
     except Exception:
         # Fail safe: baseline
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.agents.orchestrator import generate_ui_project, load_shared, open_build_graph
+from app.agents.pipeline import StageMemo
+
+POLL_INTERVAL_S = 0.25
+# A save often lands as several writes (truncate + write, or editor swap files); wait for quiet.
+DEBOUNCE_S = 0.2
+
+def watch_and_generate(poll_interval_s: float = POLL_INTERVAL_S, debounce_s: float = DEBOUNCE_S, **kwargs: Any) -> None:
+    # Long-lived `generate --watch`: prompts, templates and the LLM client are loaded once, and the stage
+    # memo keeps the parsed spec, ui-spec and generated files from the previous run, so an edit only
+    # re-runs the stages downstream of the file that changed. Writes stay incremental (no wipe), so the
+    # Vite dev server sees only the files whose bytes changed and hot-reloads them.
+    shared = load_shared(kwargs.get("cache_dir"))
+    memo = open_build_graph(kwargs["output_dir"], fresh=kwargs.get("clean", False))
+    paths = [p for p in (kwargs.get("wireframe"), kwargs.get("openapi"), kwargs.get("org_theme_path")) if _is_local(p)]
+
+    _regenerate(kwargs, shared, memo)
+    # Later regenerations update in place, whatever the first one did.
+    kwargs["clean"] = False
+    print(f"👀 Watching {', '.join(paths)} (Ctrl-C to stop)")
+    state = _snapshot(paths)
+    try:
+        while True:
+            time.sleep(poll_interval_s)
+            current = _snapshot(paths)
+            if current == state:
+                continue
+            # Debounce: keep polling until the files stop changing.
+            while True:
+                time.sleep(debounce_s)
+                settled = _snapshot(paths)
+                if settled == current:
+                    break
+                current = settled
+            changed = [p for p in paths if current.get(p) != state.get(p)]
+            state = current
+            print(f"↻ Changed: {', '.join(changed)}")
+            _regenerate(kwargs, shared, memo)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+def _regenerate(kwargs: Dict[str, Any], shared, memo: StageMemo) -> None:
+    try:
+        generate_ui_project(shared=shared, memo=memo, **kwargs)
+    except Exception as e:
+        # Half-saved JSON and the like: report and keep watching; the next save retries.
+        print(f"❌ {type(e).__name__}: {e}")
+
+def _snapshot(paths: List[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    out: Dict[str, Optional[Tuple[int, int]]] = {}
+    for p in paths:
+        try:
+            st = os.stat(p)
+            out[p] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            out[p] = None
+    return out
+
+def _is_local(path: Optional[str]) -> bool:
+    return bool(path) and not path.startswith(("http://", "https://"))
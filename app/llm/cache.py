@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional
+
+from app.tools import tracing
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_S = 14 * 24 * 3600
+# The directory is walked for eviction once per this many writes (or as soon as the tracked size is over).
+EVICT_EVERY = 64
+# Replies awaiting the caller's commit(); older uncommitted ones are dropped.
+MAX_PENDING = 256
+
+@dataclass
+class CachedResponse:
+    # Mirrors the `.content` attribute of LangChain chat messages, which is all the agents read.
+    content: str
+
+# On-disk, content-addressed store of LLM responses keyed by sha256(provider, model, messages).
+# Eviction is age-based (max_age_s) and size-based (max_bytes, least recently used first).
+class LLMCache:
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, max_age_s: float = DEFAULT_MAX_AGE_S):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # bytes on disk as of the last walk plus writes since
+        self._puts = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, provider: str, model: str, messages: Any) -> str:
+        blob = json.dumps(
+            {"provider": provider, "model": model, "messages": messages},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        p = self._path(key)
+        try:
+            st = os.stat(p)
+            if time.time() - st.st_mtime > self.max_age_s:
+                os.remove(p)
+                raise FileNotFoundError(p)
+            with open(p, "r", encoding="utf-8") as f:
+                content = json.load(f)["content"]
+            # Touch so size-based eviction drops the least recently used entries first.
+            os.utime(p, None)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            tracing.count("llm_cache.misses")
+            return None
+        with self._lock:
+            self.hits += 1
+        tracing.count("llm_cache.hits")
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        p = self._path(key)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        tmp = f"{p}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"content": content, "created": time.time()}, f)
+            written = f.tell()
+        os.replace(tmp, p)
+        with self._lock:
+            self._puts += 1
+            if self._size is not None:
+                self._size += written
+            due = self._size is None or self._size > self.max_bytes or self._puts >= EVICT_EVERY
+            if due:
+                self._puts = 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        now = time.time()
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for fn in files:
+                if not fn.endswith(".json"):
+                    continue
+                p = os.path.join(root, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.max_age_s:
+                    _remove(p)
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        if total > self.max_bytes:
+            for _, size, p in sorted(entries):
+                _remove(p)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._size = total
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+# Wraps a chat model so repeated `invoke` calls with identical messages are served from disk. A fresh reply
+# is only written once the caller has used it successfully and calls commit() (see commit_reply), so a
+# truncated or unparseable reply is asked for again next run instead of being replayed.
+class CachedLLM:
+    def __init__(self, llm, cache: LLMCache, provider: str, model: str):
+        self.llm = llm
+        self.cache = cache
+        self.provider = provider
+        self.model = model
+        self._pending: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invoke(self, messages: List[Any]):
+        key = self.cache.key(self.provider, self.model, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return CachedResponse(content=cached)
+        resp = self.llm.invoke(messages)
+        self._hold(key, getattr(resp, "content", None))
+        return resp
+
+    def commit(self, messages: List[Any]) -> None:
+        key = self.cache.key(self.provider, self.model, messages)
+        with self._lock:
+            content = self._pending.pop(key, None)
+        if content is not None:
+            self.cache.put(key, content)
+
+    def _hold(self, key: str, content: Any) -> None:
+        # Only plain, non-empty text is worth replaying.
+        if not isinstance(content, str) or not content.strip():
+            return
+        with self._lock:
+            self._pending[key] = content
+            self._pending.move_to_end(key)
+            while len(self._pending) > MAX_PENDING:
+                self._pending.popitem(last=False)
+
+    def stream(self, messages: List[Any]) -> Iterator[Any]:
+        # A hit replays the whole response as one chunk; a miss is stored once the stream completes.
+        key = self.cache.key(self.provider, self.model, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield CachedResponse(content=cached)
+            return
+        if not hasattr(self.llm, "stream"):
+            resp = self.llm.invoke(messages)
+            self._hold(key, getattr(resp, "content", None))
+            yield resp
+            return
+        parts: List[str] = []
+        text_only = True
+        for chunk in self.llm.stream(messages):
+            piece = getattr(chunk, "content", None)
+            if isinstance(piece, str):
+                parts.append(piece)
+            else:
+                text_only = False
+            yield chunk
+        if text_only:
+            self._hold(key, "".join(parts))
+
+def commit_reply(llm, messages: List[Any]) -> None:
+    # Marks the reply `llm` just gave for `messages` as good enough to cache; a no-op for uncached models.
+    commit = getattr(llm, "commit", None)
+    if callable(commit):
+        commit(messages)
+
+def _remove(p: str) -> None:
+    try:
+        os.remove(p)
+    except OSError:
+        pass
@@ -1,10 +1,33 @@
 from __future__ import annotations
 
 import os
-from typing import Optional
+from typing import Optional, Tuple
 
-def get_llm() -> Optional[object]:
+_MODEL_ENV = {
+    "openrouter": ("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet"),
+    "openai": ("OPENAI_MODEL", "gpt-4.1-mini"),
+    "anthropic": ("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022"),
+}
+
+def llm_identity() -> Tuple[str, str]:
+    # (provider, model) as configured in the environment; used to key the response cache.
     provider = (os.getenv("LLM_PROVIDER") or "none").strip().lower()
+    env, default = _MODEL_ENV.get(provider, ("", ""))
+    return provider, (os.getenv(env, default) if env else "")
+
+_KEY_ENV = {
+    "openrouter": "OPENROUTER_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+}
+
+def llm_fingerprint() -> Tuple[str, str, bool]:
+    # What get_llm() would return, without importing any SDK: provider, model and whether a key is set.
+    provider, model = llm_identity()
+    return provider, model, bool(os.getenv(_KEY_ENV.get(provider, "")) if provider in _KEY_ENV else False)
+
+def get_llm() -> Optional[object]:
+    provider, model = llm_identity()
     if provider in ("none", "", "off", "disabled"):
         return None
 
@@ -14,7 +37,6 @@ def get_llm() -> Optional[object]:
         if provider == "openrouter":
             from langchain_openai import ChatOpenAI
             api_key = os.getenv("OPENROUTER_API_KEY")
-            model = os.getenv("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet")
             if not api_key:
                 return None
             return ChatOpenAI(
@@ -26,14 +48,12 @@ def get_llm() -> Optional[object]:
         if provider == "openai":
             from langchain_openai import ChatOpenAI
             api_key = os.getenv("OPENAI_API_KEY")
-            model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
             if not api_key:
                 return None
             return ChatOpenAI(model=model, api_key=api_key, temperature=0.2)
         if provider == "anthropic":
             from langchain_anthropic import ChatAnthropic
             api_key = os.getenv("ANTHROPIC_API_KEY")
-            model = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022")
             if not api_key:
                 return None
             return ChatAnthropic(model=model, api_key=api_key, temperature=0.2)
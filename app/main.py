@@ -1,8 +1,24 @@
 import argparse
 import os
+import sys
 from dotenv import load_dotenv
 
-from app.agents.orchestrator import generate_ui_project
+from app.tools import codegen_templates, tracing
+
+# The pipeline (agents, loaders) is imported inside _run so `--help` and argument errors stay instant.
+
+def _add_run_options(g: argparse.ArgumentParser) -> None:
+    g.add_argument("--figma-token", help="Figma personal access token (or use env Figma token)")
+    g.add_argument("--clean", action="store_true", help="Wipe the output directory instead of updating it incrementally")
+    g.add_argument("--max-workers", type=int, default=4, help="Max pipeline stages (LLM calls, loaders) to run concurrently")
+    g.add_argument("--cache-dir", default=".ui-gen-cache", help="Directory for cached LLM responses and parsed specs")
+    g.add_argument("--no-cache", action="store_true", help="Disable the on-disk caches (always call the LLM, always re-parse specs)")
+    g.add_argument("--coverage", choices=("compact", "full"), default="compact",
+                   help="OpenAPI baseline: 'compact' (first 8 tags x 6 operations) or 'full' (every operation, large tags split into sub-pages)")
+    g.add_argument("--template-dir", action="append", default=[], metavar="DIR",
+                   help="Directory of codegen templates (*.j2) overriding the built-in ones; repeatable, first wins")
+    g.add_argument("--profile", metavar="TRACE_JSON", help="Write a Chrome trace (chrome://tracing / Perfetto) of stages, LLM calls and I/O")
+    g.add_argument("--cprofile", metavar="PSTATS", help="Also write a merged cProfile dump of all stages (open with pstats/snakeviz)")
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="ui-deep-agent-generator")
@@ -12,20 +28,59 @@ def build_parser() -> argparse.ArgumentParser:
     g.add_argument("--openapi", help="Path/URL to OpenAPI spec (yaml/json)")
     g.add_argument("--wireframe", help="Path to wireframe.json (preferred for precision)")
     g.add_argument("--figma-file-key", help="Figma file key")
-    g.add_argument("--figma-token", help="Figma personal access token (or use env Figma token)")
     g.add_argument("--org-theme", required=True, help="Path to org-theme.json (design tokens)")
     g.add_argument("--output", required=True, help="Output directory for generated React app")
     g.add_argument("--app-name", default="GeneratedUI", help="App name")
     g.add_argument("--base-url", default="http://localhost:8080", help="API base URL used by the generated UI")
     g.add_argument("--with-tests", action="store_true", help="Generate Playwright tests")
+    g.add_argument("--watch", action="store_true", help="Keep running and regenerate when the wireframe/spec/theme files change")
+    _add_run_options(g)
+
+    b = sub.add_parser("generate-batch", help="Generate many apps from a YAML/JSON manifest in one process")
+    b.add_argument("--manifest", required=True, help="Path to batch manifest (list of openapi/wireframe/org_theme/output jobs)")
+    b.add_argument("--jobs", type=int, default=4, help="Max jobs to run concurrently")
+    _add_run_options(b)
     return p
 
 def main():
     load_dotenv()
     args = build_parser().parse_args()
 
+    if not (args.profile or args.cprofile):
+        _run(args)
+        return
+    tracer = tracing.enable(cprofile=bool(args.cprofile))
+    try:
+        _run(args)
+    finally:
+        tracing.disable()
+        if args.profile:
+            tracer.write_chrome_trace(args.profile)
+            print(f"   Trace: {args.profile}")
+        if args.cprofile and tracer.dump_cprofile(args.cprofile):
+            print(f"   cProfile: {args.cprofile}")
+        if tracer.totals:
+            print("   Totals: " + ", ".join(f"{k}={v:g}" for k, v in sorted(tracer.totals.items())))
+
+def _run(args: argparse.Namespace) -> None:
     figma_token = args.figma_token or os.getenv("FIGMA_TOKEN")
-    generate_ui_project(
+    cache_dir = None if args.no_cache else args.cache_dir
+    codegen_templates.configure(tuple(args.template_dir), cache_dir)
+    if args.cmd == "generate-batch":
+        from app.agents.batch import run_batch
+
+        results = run_batch(
+            manifest_path=args.manifest,
+            jobs=args.jobs,
+            cache_dir=cache_dir,
+            clean=args.clean,
+            max_workers=args.max_workers,
+            figma_token=figma_token,
+            coverage=args.coverage,
+        )
+        sys.exit(0 if all(r.ok for r in results) else 1)
+
+    kwargs = dict(
         openapi=args.openapi,
         wireframe=args.wireframe,
         figma_file_key=args.figma_file_key,
@@ -35,7 +90,20 @@ def main():
         app_name=args.app_name,
         api_base_url=args.base_url,
         with_tests=args.with_tests,
+        cache_dir=cache_dir,
+        clean=args.clean,
+        max_workers=args.max_workers,
+        coverage=args.coverage,
     )
+    if args.watch:
+        from app.agents.watch import watch_and_generate
+
+        watch_and_generate(**kwargs)
+        return
+
+    from app.agents.orchestrator import generate_ui_project
+
+    generate_ui_project(**kwargs)
 
 if __name__ == "__main__":
     main()
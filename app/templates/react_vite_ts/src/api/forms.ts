@@ -0,0 +1,25 @@
+// Replaced by the generator with a FormSpec per form operation in your OpenAPI spec.
+
+export type FormErrors = Record<string, string>;
+
+export type FormField = {
+  name: string;
+  label: string;
+  kind: 'text' | 'number' | 'checkbox' | 'select' | 'json';
+  required: boolean;
+  /** <input type> for text fields (email, date, datetime-local, url, password). */
+  inputType?: string;
+  /** Choices of a select; the payload receives the value itself. */
+  options?: unknown[];
+  integer?: boolean;
+  help?: string;
+  defaultValue?: unknown;
+};
+
+export type FormSpec = {
+  fields: FormField[];
+  /** The payload is this field's value rather than an object of all fields. */
+  unwrap?: string;
+  /** Errors keyed by field path ('' for the whole payload); empty when the payload is valid. */
+  validate: (payload: unknown) => FormErrors;
+};
@@ -0,0 +1,18 @@
+// Replaced by the generator with the paging parameters detected in your OpenAPI spec.
+
+export type Paging = {
+  kind: 'offset' | 'page' | 'cursor';
+  offsetParam?: string;
+  pageParam?: string;
+  firstPage?: number;
+  cursorParam?: string;
+  sizeParam?: string;
+  maxSize?: number;
+  itemsKey?: string;
+  nextCursorKey?: string;
+  totalKey?: string;
+};
+
+export function pagingFor(_operationId: string): Paging | undefined {
+  return undefined;
+}
@@ -0,0 +1,108 @@
+import { useEffect, useReducer, useRef } from 'react';
+
+/**
+ * Small stale-while-revalidate cache shared by all sections. A revisited page renders the cached result
+ * at once and refetches in the background only when it is older than `staleMs`; sections asking for the
+ * same key at the same time share one request, which is cancelled when all of them unmount.
+ */
+
+type Entry = { data?: unknown; error?: unknown; updatedAt: number; promise?: Promise<unknown>; controller?: AbortController };
+type Fetcher<T> = (signal: AbortSignal) => Promise<T>;
+
+export const DEFAULT_STALE_MS = 30_000;
+const MAX_ENTRIES = 200;
+
+const entries = new Map<string, Entry>();
+const listeners = new Map<string, Set<() => void>>();
+// Fetcher of each key that has mounted subscribers, so invalidation can refetch it.
+const fetchers = new Map<string, Fetcher<unknown>>();
+
+function notify(key: string) {
+  listeners.get(key)?.forEach((listener) => listener());
+}
+
+function store(key: string, entry: Entry) {
+  // Map order doubles as recency: re-inserting moves the key to the end, the oldest entry goes first.
+  entries.delete(key);
+  entries.set(key, entry);
+  for (const oldest of entries.keys()) {
+    if (entries.size <= MAX_ENTRIES) break;
+    if (!listeners.has(oldest)) entries.delete(oldest);
+  }
+}
+
+export function fetchQuery<T>(key: string, fetcher: Fetcher<T>): Promise<T> {
+  const entry = entries.get(key) ?? { updatedAt: 0 };
+  if (entry.promise) return entry.promise as Promise<T>;
+  const controller = new AbortController();
+  const promise = fetcher(controller.signal).then(
+    (data) => {
+      store(key, { data, updatedAt: Date.now() });
+      notify(key);
+      return data;
+    },
+    (error) => {
+      // Keep the last good data; updatedAt is unchanged so the next mount retries. A fetch cancelled
+      // because every subscriber unmounted is not an error, and is started again if one has come back since.
+      store(key, { data: entry.data, error: controller.signal.aborted ? entry.error : error, updatedAt: entry.updatedAt });
+      notify(key);
+      const fetcher = fetchers.get(key);
+      if (controller.signal.aborted && fetcher && listeners.get(key)?.size) fetchQuery(key, fetcher).catch(() => {});
+      throw error;
+    },
+  );
+  store(key, { ...entry, promise, controller });
+  notify(key);
+  return promise;
+}
+
+/** Marks every entry whose key starts with `prefix` as stale (e.g. after a mutation). */
+export function invalidateQueries(prefix: string) {
+  for (const [key, entry] of entries) {
+    if (key.startsWith(prefix)) {
+      entry.updatedAt = 0;
+      const fetcher = fetchers.get(key);
+      if (fetcher) fetchQuery(key, fetcher).catch(() => {});
+    }
+  }
+}
+
+export function useQuery<T>(key: string | null, fetcher: Fetcher<T>, staleMs = DEFAULT_STALE_MS) {
+  const [, rerender] = useReducer((n: number) => n + 1, 0);
+  const fetcherRef = useRef(fetcher);
+  fetcherRef.current = fetcher;
+
+  useEffect(() => {
+    if (key === null) return;
+    const subscribers = listeners.get(key) ?? new Set<() => void>();
+    subscribers.add(rerender);
+    listeners.set(key, subscribers);
+    fetchers.set(key, (signal) => fetcherRef.current(signal));
+    const entry = entries.get(key);
+    if (!entry || (!entry.promise && Date.now() - entry.updatedAt > staleMs)) {
+      fetchQuery(key, fetchers.get(key)!).catch(() => {});
+    }
+    return () => {
+      subscribers.delete(rerender);
+      if (!subscribers.size) {
+        // Last subscriber gone (page left): cancel its request instead of letting it finish unseen. Deferred,
+        // because a remount (React.StrictMode runs every effect's cleanup and setup twice) resubscribes at once
+        // and still wants the response.
+        listeners.delete(key);
+        fetchers.delete(key);
+        const controller = entries.get(key)?.controller;
+        setTimeout(() => {
+          if (!listeners.get(key)?.size && entries.get(key)?.controller === controller) controller?.abort();
+        }, 0);
+      }
+    };
+  }, [key, staleMs]);
+
+  const entry = key === null ? undefined : entries.get(key);
+  return {
+    data: entry?.data as T | undefined,
+    error: entry?.error,
+    loading: !!entry?.promise && entry.data === undefined,
+    refreshing: !!entry?.promise && entry.data !== undefined,
+  };
+}
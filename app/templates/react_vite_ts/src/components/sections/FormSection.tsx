@@ -1,44 +1,241 @@
-import { useMemo, useState } from 'react';
-import { getOperationStub } from '../../generated/opmap';
+import { type ReactNode, useEffect, useId, useMemo, useRef, useState } from 'react';
+import type { FormErrors, FormField, FormSpec } from '../../api/forms';
+import type { OperationFn } from '../../generated/opmap';
+import { lazyOperation } from './operation';
 
-export function FormSection({ title, operationId }: { title: string; operationId: string }) {
+type Values = Record<string, string | boolean>;
+
+function initialValues(fields: FormField[]): Values {
+  const values: Values = {};
+  for (const f of fields) {
+    const d = f.defaultValue;
+    if (f.kind === 'checkbox') values[f.name] = d === true;
+    else if (d === undefined) values[f.name] = '';
+    else if (f.kind === 'select') values[f.name] = (f.options ?? []).includes(d) ? String(f.options!.indexOf(d)) : '';
+    else if (f.kind === 'json') values[f.name] = JSON.stringify(d, null, 2);
+    else values[f.name] = String(d);
+  }
+  return values;
+}
+
+// Form values -> operation payload. Input that doesn't convert cleanly is passed on as-is, so the
+// validator reports it against the field.
+function toPayload(form: FormSpec, values: Values): { payload: unknown; errors: FormErrors } {
+  const out: Record<string, unknown> = {};
+  const errors: FormErrors = {};
+  for (const f of form.fields) {
+    const raw = values[f.name];
+    if (typeof raw === 'boolean') out[f.name] = raw;
+    else if (raw.trim() === '') continue;
+    else if (f.kind === 'number') out[f.name] = Number(raw);
+    else if (f.kind === 'select') out[f.name] = f.options?.[Number(raw)];
+    else if (f.kind === 'json') {
+      try {
+        out[f.name] = JSON.parse(raw);
+      } catch {
+        errors[f.name] = 'must be valid JSON';
+      }
+    } else if (f.inputType === 'datetime-local') {
+      const d = new Date(raw);
+      out[f.name] = Number.isNaN(d.getTime()) ? raw : d.toISOString();
+    } else out[f.name] = raw;
+  }
+  return { payload: form.unwrap ? out[form.unwrap] : out, errors };
+}
+
+function validate(form: FormSpec, payload: unknown): FormErrors {
+  const errors = form.validate(payload);
+  if (!form.unwrap) return errors;
+  // An unwrapped payload is validated as the field's value; re-key its errors under the field.
+  const keyed: FormErrors = {};
+  for (const [path, message] of Object.entries(errors)) {
+    keyed[!path || path.startsWith('[') ? form.unwrap + path : `${form.unwrap}.${path}`] = message;
+  }
+  return keyed;
+}
+
+function fieldError(errors: FormErrors, name: string): string | undefined {
+  if (errors[name]) return `${errors[name]}.`;
+  const nested = Object.keys(errors).find((p) => p.startsWith(`${name}.`) || p.startsWith(`${name}[`));
+  return nested ? `${nested.slice(name.length).replace(/^\./, '')} ${errors[nested]}.` : undefined;
+}
+
+function Field({
+  field,
+  value,
+  error,
+  onChange,
+}: {
+  field: FormField;
+  value: string | boolean;
+  error?: string;
+  onChange: (value: string | boolean) => void;
+}) {
+  const id = useId();
+  const className = error ? 'input invalid' : 'input';
+  const label = `${field.label}${field.required ? ' *' : ''}`;
+  if (field.kind === 'checkbox') {
+    return (
+      <div>
+        <label className="checkbox">
+          <input id={id} type="checkbox" checked={value === true} onChange={(e) => onChange(e.target.checked)} />
+          {label}
+        </label>
+        {field.help && <div className="subtitle">{field.help}</div>}
+        {error && <div className="field-error">{error}</div>}
+      </div>
+    );
+  }
+
+  let control: ReactNode;
+  if (field.kind === 'select') {
+    control = (
+      <select id={id} className={className} value={String(value)} onChange={(e) => onChange(e.target.value)}>
+        <option value="">{field.required ? 'Select…' : '—'}</option>
+        {(field.options ?? []).map((o, i) => (
+          <option key={i} value={String(i)}>
+            {String(o)}
+          </option>
+        ))}
+      </select>
+    );
+  } else if (field.kind === 'json') {
+    control = (
+      <textarea id={id} className={className} rows={5} value={String(value)} onChange={(e) => onChange(e.target.value)} />
+    );
+  } else {
+    control = (
+      <input
+        id={id}
+        className={className}
+        type={field.kind === 'number' ? 'number' : field.inputType || 'text'}
+        step={field.kind === 'number' ? (field.integer ? 1 : 'any') : undefined}
+        value={String(value)}
+        onChange={(e) => onChange(e.target.value)}
+      />
+    );
+  }
+  return (
+    <div>
+      <label className="label" htmlFor={id}>
+        {label}
+      </label>
+      {control}
+      {field.help && <div className="subtitle">{field.help}</div>}
+      {error && <div className="field-error">{error}</div>}
+    </div>
+  );
+}
+
+export function FormSection({
+  title,
+  operationId,
+  operation,
+  form,
+}: {
+  title: string;
+  operationId: string;
+  operation?: OperationFn;
+  /** Generated fields and validator (src/api/forms.ts); without one the section takes raw JSON. */
+  form?: FormSpec;
+}) {
+  const [values, setValues] = useState<Values>(() => (form ? initialValues(form.fields) : {}));
   const [raw, setRaw] = useState<string>('{}');
+  const [errors, setErrors] = useState<FormErrors>({});
   const [status, setStatus] = useState<'idle'|'running'|'done'|'error'>('idle');
   const [result, setResult] = useState<string>('');
 
-  const op = useMemo(() => getOperationStub(operationId), [operationId]);
+  const op = useMemo(() => operation ?? lazyOperation(operationId), [operation, operationId]);
+  // A pending submit is cancelled when the section unmounts or the form is submitted again.
+  const pending = useRef<AbortController | null>(null);
+  useEffect(() => () => pending.current?.abort(), []);
 
   const submit = async () => {
+    let payload: unknown;
+    if (form) {
+      // Invalid input never reaches the backend.
+      const converted = toPayload(form, values);
+      const found = { ...validate(form, converted.payload), ...converted.errors };
+      setErrors(found);
+      if (Object.keys(found).length) {
+        setStatus('idle');
+        return;
+      }
+      payload = converted.payload;
+    }
+
+    pending.current?.abort();
+    const controller = new AbortController();
+    pending.current = controller;
     setStatus('running');
     setResult('');
     try {
-      const payload = JSON.parse(raw || '{}');
-      const data = await op.call(payload);
+      if (!form) payload = JSON.parse(raw || '{}');
+      const data = await op(payload, { signal: controller.signal });
       setResult(JSON.stringify(data, null, 2));
       setStatus('done');
     } catch (e: any) {
+      if (controller.signal.aborted) return;
       setResult(e?.message || String(e));
       setStatus('error');
     }
   };
 
+  const reset = () => {
+    if (form) setValues(initialValues(form.fields));
+    setRaw('{}');
+    setErrors({});
+  };
+
+  // Errors the fields don't show (e.g. on the payload as a whole).
+  const shown = form ? form.fields.map((f) => f.name) : [];
+  const other = Object.entries(errors).filter(([p]) => !shown.some((n) => p === n || p.startsWith(`${n}.`) || p.startsWith(`${n}[`)));
+
   return (
-    <div className="grid">
-      <div>
-        <label className="label">Request JSON</label>
-        <textarea
-          className="input"
-          rows={8}
-          value={raw}
-          onChange={(e) => setRaw(e.target.value)}
-          aria-label={`${title} request json`}
-        />
-      </div>
+    <form
+      className="grid"
+      noValidate
+      aria-label={title}
+      onSubmit={(e) => {
+        e.preventDefault();
+        submit();
+      }}
+    >
+      {form ? (
+        form.fields.map((f) => (
+          <Field
+            key={f.name}
+            field={f}
+            value={values[f.name]}
+            error={fieldError(errors, f.name)}
+            onChange={(v) => setValues((prev) => ({ ...prev, [f.name]: v }))}
+          />
+        ))
+      ) : (
+        <div>
+          <label className="label">Request JSON</label>
+          <textarea
+            className="input"
+            rows={8}
+            value={raw}
+            onChange={(e) => setRaw(e.target.value)}
+            aria-label={`${title} request json`}
+          />
+          <p className="muted" style={{ margin: '6px 0 0' }}>
+            No request schema was found for this operation, so it takes raw JSON.
+          </p>
+        </div>
+      )}
+      {other.map(([p, message]) => (
+        <p key={p} className="error" style={{ margin: 0 }}>
+          {p ? `${p} ${message}.` : `Request ${message}.`}
+        </p>
+      ))}
       <div style={{ display: 'flex', gap: 10 }}>
-        <button className="btn" onClick={submit} type="button">
+        <button className="btn" type="submit" disabled={status === 'running'}>
           Run
         </button>
-        <button className="btn secondary" onClick={() => setRaw('{}')} type="button">
+        <button className="btn secondary" onClick={reset} type="button">
           Reset
         </button>
       </div>
@@ -48,9 +245,6 @@ export function FormSection({ title, operationId }: { title: string; operationId
 {status === 'idle' ? 'Ready.' : result}
         </pre>
       </div>
-      <p style={{ color: 'var(--muted)', margin: 0 }}>
-        This is a generic form runner. Replace it with schema-driven fields for production.
-      </p>
-    </div>
+    </form>
   );
 }
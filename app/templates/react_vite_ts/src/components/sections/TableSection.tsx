@@ -1,76 +1,157 @@
-import { useEffect, useMemo, useState } from 'react';
-import { getOperationStub } from '../../generated/opmap';
+import { memo, useEffect, useMemo, useRef, useState } from 'react';
+import type { OperationFn } from '../../generated/opmap';
+import { lazyOperation } from './operation';
+import { pagingFor, type Paging } from '../../api/paging';
+import { useQuery } from '../../api/queryCache';
 
-export function TableSection({ title, operationId }: { title: string; operationId: string }) {
-  const [status, setStatus] = useState<'idle'|'loading'|'done'|'error'>('idle');
-  const [rows, setRows] = useState<any[]>([]);
-  const [error, setError] = useState<string>('');
+const PAGE_SIZE = 50;
+const MAX_COLUMNS = 8;
+// Rows are a fixed height (see .table td in theme.css) so the visible window is computed from scrollTop.
+const ROW_HEIGHT = 40;
+const VIEWPORT_ROWS = 12;
+const OVERSCAN = 6;
 
-  const op = useMemo(() => getOperationStub(operationId), [operationId]);
+type Row = Record<string, unknown>;
+type PageResult = { rows: Row[]; total?: number; nextCursor?: string };
 
-  useEffect(() => {
-    let mounted = true;
-    const run = async () => {
-      setStatus('loading');
-      setError('');
-      try {
-        const data = await op.call(undefined);
-        const list = Array.isArray(data) ? data : (data?.items || data?.data || []);
-        if (mounted) {
-          setRows(Array.isArray(list) ? list : []);
-          setStatus('done');
-        }
-      } catch (e: any) {
-        if (mounted) {
-          setError(e?.message || String(e));
-          setStatus('error');
-        }
-      }
-    };
-    run();
-    return () => { mounted = false; };
-  }, [op]);
-
-  if (status === 'error') {
-    return <div className="card"><p style={{ color: 'var(--danger)' }}>{error}</p></div>;
+function pageParams(paging: Paging, page: number, cursor: string | undefined, size: number) {
+  const p: Record<string, unknown> = {};
+  if (paging.sizeParam) p[paging.sizeParam] = size;
+  if (paging.kind === 'offset' && paging.offsetParam) p[paging.offsetParam] = page * size;
+  if (paging.kind === 'page' && paging.pageParam) p[paging.pageParam] = (paging.firstPage ?? 1) + page;
+  if (paging.kind === 'cursor' && paging.cursorParam && cursor !== undefined) p[paging.cursorParam] = cursor;
+  return p;
+}
+
+function toPage(data: any, paging: Paging | undefined): PageResult {
+  const list = paging?.itemsKey ? data?.[paging.itemsKey] : Array.isArray(data) ? data : (data?.items || data?.data || []);
+  const total = paging?.totalKey ? data?.[paging.totalKey] : undefined;
+  const next = paging?.nextCursorKey ? data?.[paging.nextCursorKey] : undefined;
+  return {
+    rows: Array.isArray(list) ? list : [],
+    total: typeof total === 'number' ? total : undefined,
+    nextCursor: next === undefined || next === null || next === '' ? undefined : String(next),
+  };
+}
+
+// Nested values are stringified once per object, not on every render.
+const objectText = new WeakMap<object, string>();
+
+function cellText(value: unknown): string {
+  if (value === null || value === undefined) return '';
+  if (typeof value !== 'object') return String(value);
+  let text = objectText.get(value);
+  if (text === undefined) {
+    text = JSON.stringify(value);
+    objectText.set(value, text);
   }
+  return text;
+}
+
+const TableRow = memo(function TableRow({ row, cols }: { row: Row; cols: string[] }) {
+  return (
+    <tr>
+      {cols.map((c) => (
+        <td key={c} title={cellText(row[c])}>{cellText(row[c])}</td>
+      ))}
+    </tr>
+  );
+});
 
-  const cols = Object.keys(rows?.[0] || {}).slice(0, 8);
+export function TableSection({
+  title,
+  operationId,
+  operation,
+}: {
+  title: string;
+  operationId: string;
+  operation?: OperationFn;
+}) {
+  const op = useMemo(() => operation ?? lazyOperation(operationId), [operation, operationId]);
+  const paging = useMemo(() => pagingFor(operationId), [operationId]);
+  const size = Math.min(PAGE_SIZE, paging?.maxSize ?? PAGE_SIZE);
+
+  const [page, setPage] = useState(0);
+  // Cursor paging: cursors[n] fetches page n; page 0 needs none.
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+  const params = paging ? pageParams(paging, page, cursors[page], size) : undefined;
+  const key = `${operationId}:${JSON.stringify(params ?? null)}`;
+  const query = useQuery<PageResult>(key, async (signal) => toPage(await op(params, { signal }), paging));
+
+  const result = query.data;
+  const rows = result?.rows ?? [];
+  const cols = useMemo(() => Object.keys(rows[0] || {}).slice(0, MAX_COLUMNS), [rows]);
+
+  useEffect(() => {
+    const next = result?.nextCursor;
+    if (paging?.kind === 'cursor' && next !== undefined) {
+      setCursors((c) => (c[page + 1] === next ? c : [...c.slice(0, page + 1), next]));
+    }
+  }, [paging, page, result]);
+
+  // Windowing: only the rows in view (plus overscan) are mounted; spacer rows keep the scroll height.
+  const scroller = useRef<HTMLDivElement>(null);
+  const [scrollTop, setScrollTop] = useState(0);
+  useEffect(() => {
+    if (scroller.current) scroller.current.scrollTop = 0;
+    setScrollTop(0);
+  }, [key]);
+  const virtual = rows.length > VIEWPORT_ROWS * 2;
+  const start = virtual ? Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN) : 0;
+  const end = virtual ? Math.min(rows.length, start + VIEWPORT_ROWS + 2 * OVERSCAN) : rows.length;
+
+  let hasNext = false;
+  if (paging?.kind === 'cursor') hasNext = cursors[page + 1] !== undefined;
+  else if (paging && result?.total !== undefined) hasNext = (page + 1) * size < result.total;
+  else if (paging) hasNext = rows.length >= size;
+  const pageCount = paging && result?.total !== undefined ? Math.max(1, Math.ceil(result.total / size)) : undefined;
+
+  if (query.error && !result) {
+    const e = query.error as any;
+    return <div className="card"><p className="error">{e?.message || String(e)}</p></div>;
+  }
 
   return (
     <div className="grid">
-      <div style={{ color: 'var(--muted)' }}>
-        {status === 'loading' ? 'Loading…' : `${rows.length} row(s)`}
+      <div className="muted">
+        {query.loading ? 'Loading…' : `${rows.length} row(s)`}
+        {paging && ` · page ${page + 1}${pageCount ? ` of ${pageCount}` : ''}`}
+        {query.refreshing && ' · refreshing'}
       </div>
 
-      <div style={{ overflowX: 'auto' }}>
-        <table style={{ width: '100%', borderCollapse: 'collapse' }}>
+      <div
+        ref={scroller}
+        className={virtual ? 'table-scroll virtual' : 'table-scroll'}
+        onScroll={virtual ? (e) => setScrollTop(e.currentTarget.scrollTop) : undefined}
+      >
+        <table className="table" aria-label={title}>
           <thead>
             <tr>
               {cols.map((c) => (
-                <th key={c} style={{ textAlign: 'left', padding: '10px 8px', borderBottom: '1px solid var(--border)' }}>
-                  {c}
-                </th>
+                <th key={c}>{c}</th>
               ))}
             </tr>
           </thead>
           <tbody>
-            {rows.slice(0, 50).map((r, idx) => (
-              <tr key={idx}>
-                {cols.map((c) => (
-                  <td key={c} style={{ padding: '10px 8px', borderBottom: '1px solid var(--border)' }}>
-                    {typeof r?.[c] === 'object' ? JSON.stringify(r?.[c]) : String(r?.[c] ?? '')}
-                  </td>
-                ))}
-              </tr>
+            {start > 0 && <tr aria-hidden="true" style={{ height: start * ROW_HEIGHT }} />}
+            {rows.slice(start, end).map((r, idx) => (
+              <TableRow key={start + idx} row={r} cols={cols} />
             ))}
+            {end < rows.length && <tr aria-hidden="true" style={{ height: (rows.length - end) * ROW_HEIGHT }} />}
           </tbody>
         </table>
       </div>
 
-      <p style={{ color: 'var(--muted)', margin: 0 }}>
-        This table is heuristic. Refine columns + paging as needed.
-      </p>
+      {paging && (
+        <nav className="pager" aria-label={`${title} pages`}>
+          <button className="btn secondary" type="button" disabled={page === 0} onClick={() => setPage(page - 1)}>
+            Previous
+          </button>
+          <button className="btn secondary" type="button" disabled={!hasNext} onClick={() => setPage(page + 1)}>
+            Next
+          </button>
+        </nav>
+      )}
     </div>
   );
 }
@@ -0,0 +1,12 @@
+import type { OperationFn } from '../../generated/opmap';
+
+/**
+ * Sections are normally handed their operation by the page. Without one, the operationId is looked up in
+ * the generated map, loaded on demand so the map (and every operation in it) stays out of the page chunk.
+ */
+export function lazyOperation(operationId: string): OperationFn {
+  return async (payload, options) => {
+    const { getOperation } = await import('../../generated/opmap');
+    return getOperation(operationId)(payload, options);
+  };
+}
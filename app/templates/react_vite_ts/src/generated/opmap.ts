@@ -1,28 +1,22 @@
-import * as ops from '../api/operations';
+import type { RequestOptions } from '../api/http';
+
+export type OperationFn = (payload?: any, options?: RequestOptions) => Promise<unknown>;
 
 /**
- * The generator stubs `operations.ts` based on operationIds found in ui-spec.
- * This adapter returns a callable with a consistent interface.
+ * The generator replaces this file with a static operationId -> function map over `src/api/operations.ts`.
  */
-export function getOperationStub(operationId: string): { call: (payload?: unknown) => Promise<any> } {
-  const fn = (ops as any)[toFnName(operationId)];
-  if (typeof fn === 'function') {
-    return { call: (payload?: unknown) => fn(payload) };
-  }
-  return {
-    call: async () => {
-      throw new Error(`No operation stub for operationId="${operationId}". Update src/api/operations.ts.`);
-    }
-  };
+export const OPERATIONS: Record<string, OperationFn> = {};
+
+export function getOperation(operationId: string): OperationFn {
+  return (
+    OPERATIONS[operationId] ??
+    (async () => {
+      throw new Error(`No operation for operationId="${operationId}". Update src/api/operations.ts.`);
+    })
+  );
 }
 
-function toFnName(operationId: string) {
-  const pascal = operationId
-    .replace(/[^a-zA-Z0-9]+/g, ' ')
-    .trim()
-    .split(' ')
-    .filter(Boolean)
-    .map((p) => p.slice(0,1).toUpperCase() + p.slice(1))
-    .join('');
-  return pascal.slice(0,1).toLowerCase() + pascal.slice(1);
+/** @deprecated Use getOperation(). */
+export function getOperationStub(operationId: string): { call: OperationFn } {
+  return { call: getOperation(operationId) };
 }
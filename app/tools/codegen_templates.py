@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Optional, Tuple
+
+# Jinja2 templates for the generated TypeScript/CSS (pages, router, nav, home, operations, theme.css).
+# Directories passed to configure() are searched first, so an organization can override any template
+# by dropping a file with the same name there. Compiled templates are kept per process, and with a cache
+# dir also as bytecode on disk, so batch/watch runs and later CLI runs skip template compilation.
+
+BUILTIN_DIR = os.path.join(os.path.dirname(__file__), "..", "templates", "codegen")
+
+_lock = threading.Lock()
+_config: Tuple[Tuple[str, ...], Optional[str]] = ((), None)
+_env = None
+_fingerprint: Optional[str] = None  # of the override dirs, as of the last overrides_fingerprint()
+
+def configure(template_dirs: Tuple[str, ...] = (), cache_dir: Optional[str] = None) -> None:
+    global _config, _env, _fingerprint
+    config = (tuple(os.path.abspath(d) for d in template_dirs), cache_dir)
+    with _lock:
+        if config != _config:
+            _config = config
+            _env = None
+            _fingerprint = None
+
+def render(name: str, **context: Any) -> str:
+    # generate() streams the template's output chunks; joining once keeps rendering linear in its size.
+    return "".join(environment().get_template(name).generate(**context))
+
+def overrides_fingerprint() -> str:
+    # Part of the build-graph key of every stage that renders templates: editing an override re-renders.
+    # The environment never reloads templates itself, so a changed fingerprint also drops it; otherwise watch
+    # mode would re-run those stages with the previously compiled templates.
+    global _env, _fingerprint
+    h = hashlib.sha256()
+    for d in _config[0]:
+        for root, dirnames, filenames in os.walk(d):
+            dirnames.sort()
+            for fn in sorted(filenames):
+                st = os.stat(os.path.join(root, fn))
+                h.update(f"{os.path.join(root, fn)}:{st.st_mtime_ns}:{st.st_size};".encode("utf-8"))
+    fingerprint = h.hexdigest()
+    with _lock:
+        if _fingerprint is not None and fingerprint != _fingerprint:
+            _env = None
+        _fingerprint = fingerprint
+    return fingerprint
+
+def environment():
+    global _env
+    with _lock:
+        if _env is None:
+            _env = _build_environment(*_config)
+        return _env
+
+def _build_environment(template_dirs: Tuple[str, ...], cache_dir: Optional[str]):
+    import jinja2
+
+    bytecode_cache = None
+    if cache_dir:
+        path = os.path.join(cache_dir, "jinja")
+        os.makedirs(path, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(path)
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(list(template_dirs) + [BUILTIN_DIR]),
+        bytecode_cache=bytecode_cache,
+        undefined=jinja2.StrictUndefined,
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        auto_reload=False,
+        cache_size=-1,
+    )
+    env.filters["json"] = _json
+    env.filters["jsx_text"] = jsx_text
+    env.filters["jsx_str"] = lambda v: "{" + _json(v) + "}"
+    return env
+
+def _json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+def jsx_text(s: Any) -> str:
+    return (str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace("{", "&#123;").replace("}", "&#125;"))
@@ -1,24 +1,238 @@
 from __future__ import annotations
 
-from typing import Any, Dict
-import requests
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
-def load_figma_minimal(file_key: str, token: str) -> Dict[str, Any]:
-    # Minimal extraction: list pages + basic structure. Figma API response is large.
+from app.tools import tracing
+from app.tools.http_fetch import fetch
+
+# Pages (CANVAS) and their direct children (frames/components) are all the outline needs.
+DEFAULT_DEPTH = 2
+# Node ids per /nodes request; keeps URLs short and lets batches run in parallel.
+NODE_BATCH_SIZE = 20
+# How deep below each frame the extraction walks, and how many texts it keeps per frame.
+SUMMARY_DEPTH = 4
+MAX_TEXTS = 12
+
+_CONTAINER_TYPES = ("FRAME", "COMPONENT", "COMPONENT_SET", "INSTANCE", "GROUP", "SECTION")
+
+_PAGE = "document.children.item"
+_FRAME = "document.children.item.children.item"
+
+def load_figma_minimal(
+    file_key: str,
+    token: str,
+    http_cache_dir: Optional[str] = None,
+    depth: Optional[int] = DEFAULT_DEPTH,
+    ids: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    # Minimal extraction: list pages + their top-level frames. Figma API response is large, so it is
+    # streamed to disk, trimmed server-side with `depth`/`ids`, and parsed incrementally.
     headers = {"X-Figma-Token": token}
     url = f"https://api.figma.com/v1/files/{file_key}"
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-    data = r.json()
+    params: Dict[str, Any] = {}
+    if depth:
+        params["depth"] = depth
+    if ids:
+        params["ids"] = ",".join(ids)
+    res = fetch(url, headers=headers, params=params or None, cache_dir=http_cache_dir)
+    try:
+        with open(res.path, "rb") as f, tracing.span("figma.outline", cat="parse"):
+            outline = _stream_outline(f) if _ijson() is not None else _outline(json.load(f))
+    finally:
+        res.discard()
+    return outline
+
+def load_figma(
+    file_key: str,
+    token: str,
+    http_cache_dir: Optional[str] = None,
+    node_cache_dir: Optional[str] = None,
+    max_workers: int = 4,
+) -> Dict[str, Any]:
+    # Outline first (cheap), then the subtree of every top-level frame via batched, parallel /nodes requests.
+    outline = load_figma_minimal(file_key, token, http_cache_dir=http_cache_dir)
+    frame_ids = [fr["id"] for pg in outline["pages"] for fr in pg["frames"] if fr.get("type") in _CONTAINER_TYPES]
+    version = outline["raw"].get("version") or outline["raw"].get("lastModified") or ""
+    nodes = load_figma_nodes(
+        file_key, token, frame_ids, version,
+        node_cache_dir=node_cache_dir, http_cache_dir=http_cache_dir, max_workers=max_workers,
+    )
+    for pg in outline["pages"]:
+        for fr in pg["frames"]:
+            if fr["id"] in nodes:
+                fr["node"] = nodes[fr["id"]]
+    return outline
+
+def load_figma_nodes(
+    file_key: str,
+    token: str,
+    ids: List[str],
+    version: str,
+    node_cache_dir: Optional[str] = None,
+    http_cache_dir: Optional[str] = None,
+    max_workers: int = 4,
+) -> Dict[str, Dict[str, Any]]:
+    # Node summaries are cached per node and stamped with the file version; only nodes without a
+    # current entry are requested. Figma exposes no per-node modification time, so the file
+    # version/lastModified is the invalidation key.
+    out: Dict[str, Dict[str, Any]] = {}
+    missing = []
+    for node_id in ids:
+        hit = _read_node_cache(node_cache_dir, file_key, node_id, version)
+        if hit is not None:
+            out[node_id] = hit
+        else:
+            missing.append(node_id)
+    tracing.count("figma_node_cache.hits", len(out))
+    tracing.count("figma_node_cache.misses", len(missing))
+    if not missing:
+        return out
+
+    headers = {"X-Figma-Token": token}
+    url = f"https://api.figma.com/v1/files/{file_key}/nodes"
+    batches = [missing[i:i + NODE_BATCH_SIZE] for i in range(0, len(missing), NODE_BATCH_SIZE)]
+
+    def _fetch_batch(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+        res = fetch(url, headers=headers, params={"ids": ",".join(batch)}, cache_dir=http_cache_dir)
+        try:
+            with open(res.path, "rb") as f, tracing.span("figma.nodes", cat="parse", nodes=len(batch)):
+                # One node subtree in memory at a time when ijson is available.
+                ijson = _ijson()
+                entries = ijson.kvitems(f, "nodes", use_float=True) if ijson is not None else (json.load(f).get("nodes") or {}).items()
+                return {
+                    node_id: summarize_node(entry["document"])
+                    for node_id, entry in entries
+                    if isinstance((entry or {}).get("document"), dict)
+                }
+        finally:
+            res.discard()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="figma") as pool:
+        for summaries in pool.map(_fetch_batch, batches):
+            for node_id, summary in summaries.items():
+                out[node_id] = summary
+                _write_node_cache(node_cache_dir, file_key, node_id, version, summary)
+    return out
+
+def summarize_node(node: Dict[str, Any], depth: int = SUMMARY_DEPTH) -> Dict[str, Any]:
+    # Frames, components and auto-layout settings down to `depth`, plus the first texts under the node.
+    summary: Dict[str, Any] = {"id": node.get("id"), "name": node.get("name"), "type": node.get("type")}
+    if node.get("layoutMode") and node.get("layoutMode") != "NONE":
+        summary["layout"] = {
+            "mode": node.get("layoutMode"),
+            "spacing": node.get("itemSpacing"),
+            "padding": [node.get(k) for k in ("paddingTop", "paddingRight", "paddingBottom", "paddingLeft")],
+        }
+    if node.get("type") == "INSTANCE" and node.get("componentId"):
+        summary["componentId"] = node.get("componentId")
+
+    texts: List[str] = []
+    stack = list(reversed(node.get("children") or []))
+    while stack and len(texts) < MAX_TEXTS:
+        cur = stack.pop()
+        if cur.get("type") == "TEXT" and (cur.get("characters") or "").strip():
+            texts.append(cur["characters"].strip())
+        stack.extend(reversed(cur.get("children") or []))
+    if texts:
+        summary["texts"] = texts
+
+    if depth > 0:
+        children = [
+            summarize_node(c, depth - 1)
+            for c in (node.get("children") or [])
+            if c.get("type") in _CONTAINER_TYPES
+        ]
+        if children:
+            summary["children"] = children
+    return summary
+
+@lru_cache(maxsize=None)
+def _ijson():
+    # Imported on first Figma load. Optional: without it JSON is read with json.load (bounded by `depth`).
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+def _node_cache_path(cache_dir: str, file_key: str, node_id: str) -> str:
+    return os.path.join(cache_dir, file_key, hashlib.sha1(node_id.encode("utf-8")).hexdigest() + ".json")
+
+def _read_node_cache(cache_dir: Optional[str], file_key: str, node_id: str, version: str) -> Optional[Dict[str, Any]]:
+    if not cache_dir or not version:
+        return None
+    try:
+        with open(_node_cache_path(cache_dir, file_key, node_id), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry.get("summary") if entry.get("version") == version else None
+
+def _write_node_cache(cache_dir: Optional[str], file_key: str, node_id: str, version: str, summary: Dict[str, Any]) -> None:
+    if not cache_dir or not version:
+        return
+    p = _node_cache_path(cache_dir, file_key, node_id)
+    os.makedirs(os.path.dirname(p), exist_ok=True)
+    tmp = f"{p}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "summary": summary}, f)
+    os.replace(tmp, p)
+
+def _stream_outline(f) -> Dict[str, Any]:
+    # Event-based: only the current prefix stack is held in memory, whatever the document size.
+    top: Dict[str, Any] = {}
+    pages: List[Dict[str, Any]] = []
+    page: Optional[Dict[str, Any]] = None
+    frame: Optional[Dict[str, Any]] = None
+    for prefix, event, value in _ijson().parse(f):
+        if event == "start_map":
+            if prefix == _PAGE:
+                page = {"id": None, "name": None, "type": None, "frames": []}
+            elif prefix == _FRAME and page is not None:
+                frame = {"id": None, "name": None, "type": None}
+        elif event == "end_map":
+            if prefix == _PAGE and page is not None:
+                if page["type"] == "CANVAS":
+                    pages.append(page)
+                page = None
+            elif prefix == _FRAME and page is not None and frame is not None:
+                page["frames"].append(frame)
+                frame = None
+        elif prefix in ("name", "lastModified", "version"):
+            top[prefix] = value
+        elif page is not None and prefix.startswith(_PAGE + "."):
+            key = prefix.rsplit(".", 1)[1]
+            if key not in ("id", "name", "type"):
+                continue
+            if prefix == f"{_PAGE}.{key}":
+                page[key] = value
+            elif frame is not None and prefix == f"{_FRAME}.{key}":
+                frame[key] = value
+    return {
+        "name": top.get("name"),
+        "pages": pages,
+        "raw": {"lastModified": top.get("lastModified"), "version": top.get("version")},
+    }
+
+def _outline(data: Dict[str, Any]) -> Dict[str, Any]:
     doc = data.get("document", {})
 
     pages = []
     children = (doc.get("children") or [])
     for child in children:
         if child.get("type") == "CANVAS":
-            pages.append({"id": child.get("id"), "name": child.get("name"), "type": child.get("type")})
+            frames = [
+                {"id": c.get("id"), "name": c.get("name"), "type": c.get("type")}
+                for c in (child.get("children") or [])
+            ]
+            pages.append({"id": child.get("id"), "name": child.get("name"), "type": child.get("type"), "frames": frames})
     return {
         "name": data.get("name"),
         "pages": pages,
-        "raw": {"lastModified": data.get("lastModified")},
+        "raw": {"lastModified": data.get("lastModified"), "version": data.get("version")},
     }
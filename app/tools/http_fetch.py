@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.tools import tracing
+
+if TYPE_CHECKING:
+    import requests
+
+# `requests` is imported on first use: offline runs (wireframe/local spec) never pay for it.
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 1024 * 1024
+MAX_BACKOFF_S = 30.0
+# Cache limits, as for LLM responses: entries unused for this long are dropped, and past the size the least
+# recently used go first. The directory is checked on the first write of a process and every EVICT_EVERY after.
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+MAX_CACHE_AGE_S = 14 * 24 * 3600
+EVICT_EVERY = 32
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_writes: Dict[str, int] = {}
+_writes_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    # One pooled session per process so repeated fetches (spec, Figma pages/nodes) reuse connections.
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _session = s
+        return _session
+
+@dataclass
+class FetchResult:
+    url: str
+    # Body on disk: the cache entry when cache_dir is set, otherwise a temp file owned by the caller.
+    path: str
+    status: int
+    from_cache: bool
+    cached: bool
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def discard(self) -> None:
+        if not self.cached:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+def fetch(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    cache_dir: Optional[str] = None,
+    retries: int = 4,
+    backoff_s: float = 0.5,
+    timeout: float = 30,
+) -> FetchResult:
+    # GET with conditional requests (ETag / Last-Modified) against an on-disk cache, retry with jittered
+    # exponential backoff on 429/5xx and connection errors, and bodies streamed to disk in chunks.
+    with tracing.span("http.get", cat="io", url=url) as sp:
+        res = _fetch(url, headers, params, cache_dir, retries, backoff_s, timeout)
+        sp.set(status=res.status, from_cache=res.from_cache)
+        if not res.from_cache:
+            tracing.count("http.bytes", os.path.getsize(res.path))
+        return res
+
+def _fetch(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    params: Optional[Dict[str, Any]],
+    cache_dir: Optional[str],
+    retries: int,
+    backoff_s: float,
+    timeout: float,
+) -> FetchResult:
+    headers = dict(headers or {})
+    body_path = meta_path = None
+    meta: Dict[str, Any] = {}
+    if cache_dir:
+        key = _cache_key(url, headers, params)
+        body_path = os.path.join(cache_dir, f"{key}.body")
+        meta_path = os.path.join(cache_dir, f"{key}.json")
+        meta = _read_meta(meta_path) if os.path.exists(body_path) else {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    import requests
+
+    session = get_session()
+    for attempt in range(retries + 1):
+        try:
+            resp = session.get(url, headers=headers, params=params, timeout=timeout, stream=True)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                raise
+            tracing.count("http.retries")
+            time.sleep(_backoff(attempt, backoff_s, None))
+            continue
+        with resp:
+            if resp.status_code == 304 and body_path and meta:
+                _touch(body_path)
+                return FetchResult(url, body_path, 304, from_cache=True, cached=True)
+            if resp.status_code in RETRY_STATUSES and attempt < retries:
+                tracing.count("http.retries")
+                time.sleep(_backoff(attempt, backoff_s, resp.headers.get("Retry-After")))
+                continue
+            resp.raise_for_status()
+            path = _stream_to_disk(resp, body_path, cache_dir)
+            if meta_path:
+                _write_meta(meta_path, {
+                    "url": url,
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                })
+                _written(cache_dir)
+            return FetchResult(url, path, resp.status_code, from_cache=False, cached=bool(body_path))
+    raise RuntimeError(f"GET {url} failed after {retries + 1} attempt(s)")
+
+def fetch_bytes(url: str, **kwargs: Any) -> bytes:
+    res = fetch(url, **kwargs)
+    try:
+        return res.read_bytes()
+    finally:
+        res.discard()
+
+def _stream_to_disk(resp: requests.Response, body_path: Optional[str], cache_dir: Optional[str]) -> str:
+    target_dir = cache_dir or tempfile.gettempdir()
+    os.makedirs(target_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="fetch-", suffix=".part", dir=target_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+        if body_path is None:
+            return tmp
+        os.replace(tmp, body_path)
+        return body_path
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def evict_cache(cache_dir: str, max_bytes: int = MAX_CACHE_BYTES, max_age_s: float = MAX_CACHE_AGE_S) -> None:
+    # An entry is its .body and .json files; its age is the body's mtime, refreshed whenever a 304 reuses it.
+    now = time.time()
+    entries: Dict[str, List[Any]] = {}
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for fn in names:
+        key, ext = os.path.splitext(fn)
+        if ext not in (".body", ".json"):
+            continue
+        try:
+            st = os.stat(os.path.join(cache_dir, fn))
+        except OSError:
+            continue
+        entry = entries.setdefault(key, [0.0, 0, []])
+        if ext == ".body":
+            entry[0] = st.st_mtime
+        entry[1] += st.st_size
+        entry[2].append(os.path.join(cache_dir, fn))
+    total = 0
+    live = []
+    for used, size, paths in entries.values():
+        if now - used > max_age_s:
+            _remove(paths)
+        else:
+            live.append((used, size, paths))
+            total += size
+    for _, size, paths in sorted(live, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        _remove(paths)
+        total -= size
+
+def _written(cache_dir: str) -> None:
+    with _writes_lock:
+        n = _writes.get(cache_dir, 0)
+        _writes[cache_dir] = n + 1
+    if n % EVICT_EVERY == 0:
+        evict_cache(cache_dir, MAX_CACHE_BYTES, MAX_CACHE_AGE_S)
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+def _remove(paths: List[str]) -> None:
+    for p in paths:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+def _backoff(attempt: int, base_s: float, retry_after: Optional[str]) -> float:
+    delay = _retry_after_s(retry_after)
+    if delay is not None:
+        return min(delay, MAX_BACKOFF_S)
+    # Full jitter: spreads retries from concurrent workers instead of synchronizing them.
+    return random.uniform(0, min(MAX_BACKOFF_S, base_s * (2 ** attempt)))
+
+def _retry_after_s(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delay-seconds or an HTTP-date.
+    value = (value or "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def _cache_key(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]]) -> str:
+    # Headers are part of the key (hashed, so tokens never land on disk in clear text).
+    blob = json.dumps({"url": url, "params": params or {}, "headers": headers}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def _read_meta(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_meta(path: str, meta: Dict[str, Any]) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.tools.openapi_index import OpenAPIIndex, Operation
+from app.tools.ts_validators import ValidatorCompiler
+
+# <input type> for string formats the browser has a native control for.
+INPUT_TYPES = {"email": "email", "date": "date", "date-time": "datetime-local", "uri": "url", "password": "password"}
+MAX_HELP_CHARS = 160
+
+def form_spec(
+    name: str, op: Operation, index: OpenAPIIndex, validators: ValidatorCompiler, shared: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    # The fields of a FormSection for `op` and the name of the validator compiled for its payload. The
+    # payload is shaped like the operations.ts function's argument: parameters and body properties side by
+    # side, a non-object body under `body`, or (no parameters) the body itself via `unwrap`. The fields of a
+    # $ref'd body are collected once per schema in `shared` ({ref: {"name", "schema", "fields"}}) and spread in.
+    params = [prm for prm in op.parameters if prm.get("in") in ("path", "query", "header")]
+    has_body = op.method not in ("get", "delete") and op.request_schema is not None
+    body = _resolve(op.request_schema, index) if has_body else {}
+    body_required = bool(_resolve(op.raw.get("requestBody"), index).get("required"))
+    body_props = _object_properties(body, index) if has_body else None
+
+    props: Dict[str, Any] = {}
+    required: List[str] = []
+    for prm in params:
+        props[prm["name"]] = prm.get("schema") if "schema" in prm else prm
+        if prm.get("required") or prm.get("in") == "path":
+            required.append(prm["name"])
+    schema: Dict[str, Any] = {"type": "object", "properties": props, "required": required}
+    unwrap = None
+    fields = [_field(n, props[n], n in required, index) for n in props]
+    spread = None
+    if has_body and body_props is not None and (params or body_props[0]):
+        # The body schema checks its own properties; the parameters are checked alongside it (and are not
+        # "additional" properties of a closed body).
+        closed = body.get("additionalProperties") is False
+        schema["allOf"] = [{**body, "properties": {**{n: {} for n in props}, **body.get("properties", {})}} if closed else op.request_schema]
+        body_fields = [_field(n, s, n in body_props[1], index) for n, s in body_props[0].items() if n not in props]
+        ref = op.request_schema.get("$ref") if isinstance(op.request_schema, dict) else None
+        if isinstance(ref, str) and len(body_fields) == len(body_props[0]):
+            if ref not in shared:
+                shared[ref] = {"name": f"FIELDS_{len(shared)}", "schema": ref.rsplit("/", 1)[-1], "fields": body_fields}
+            spread = shared[ref]["name"]
+        else:
+            fields += body_fields
+        if not params:
+            schema = op.request_schema
+    elif has_body:
+        props["body"] = op.request_schema
+        if body_required:
+            required.append("body")
+        fields.append(_field("body", op.request_schema, body_required, index))
+        if not params:
+            schema, unwrap = op.request_schema, "body"
+
+    validator = validators.compile(f"{name[:1].upper()}{name[1:]}Payload", schema)
+    return {"fields": fields, "spread": spread, "validator": validator, "unwrap": unwrap}
+
+def _field(name: str, schema: Any, required: bool, index: OpenAPIIndex) -> Dict[str, Any]:
+    s = _resolve(schema, index)
+    field: Dict[str, Any] = {"name": name, "label": s.get("title") or _label(name), "required": required}
+    t = s.get("type")
+    if isinstance(t, list):
+        t = next((x for x in t if x != "null"), None)
+    if isinstance(s.get("enum"), list) and s["enum"]:
+        field.update(kind="select", options=s["enum"])
+    elif t == "boolean":
+        # An optional flag needs a third "unset" state, so it is a select rather than a checkbox.
+        if required:
+            field["kind"] = "checkbox"
+        else:
+            field.update(kind="select", options=[True, False])
+    elif t in ("integer", "number"):
+        field["kind"] = "number"
+        if t == "integer":
+            field["integer"] = True
+    elif t == "string" and s.get("format") != "binary":
+        field["kind"] = "text"
+        if s.get("format") in INPUT_TYPES:
+            field["inputType"] = INPUT_TYPES[s["format"]]
+    else:
+        field["kind"] = "json"
+    if isinstance(s.get("description"), str) and s["description"].strip():
+        help_text = s["description"].strip().splitlines()[0]
+        field["help"] = help_text if len(help_text) <= MAX_HELP_CHARS else help_text[:MAX_HELP_CHARS - 1] + "…"
+    if "default" in s:
+        field["defaultValue"] = s["default"]
+    return field
+
+def _object_properties(schema: Dict[str, Any], index: OpenAPIIndex) -> Optional[tuple]:
+    # (properties, required) of an object schema, merging allOf parts; None for non-object bodies.
+    if not (schema.get("type") == "object" or "properties" in schema or "allOf" in schema):
+        return None
+    props = dict(schema.get("properties") or {}) if isinstance(schema.get("properties"), dict) else {}
+    required = [r for r in schema.get("required") or [] if isinstance(r, str)]
+    for part in schema.get("allOf") or []:
+        merged = _object_properties(_resolve(part, index), index)
+        if merged:
+            props.update({k: v for k, v in merged[0].items() if k not in props})
+            required += merged[1]
+    return props, set(required)
+
+def _label(name: str) -> str:
+    words = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", name).replace("_", " ").replace("-", " ").split()
+    return " ".join(words).capitalize() if words else name
+
+def _resolve(schema: Any, index: OpenAPIIndex) -> Dict[str, Any]:
+    try:
+        schema = index.resolve(schema)
+    except (KeyError, ValueError):
+        return {}
+    return schema if isinstance(schema, dict) else {}
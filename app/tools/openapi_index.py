@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+@dataclass
+class Operation:
+    operation_id: str
+    method: str
+    path: str
+    summary: str
+    tags: List[str]
+    # Path-level and operation-level parameters merged, with $refs resolved one level.
+    parameters: List[Dict[str, Any]] = field(default_factory=list)
+    request_schema: Optional[Dict[str, Any]] = None
+    response_schema: Optional[Dict[str, Any]] = None
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+def operation_id_for(method: str, path: str, op: Dict[str, Any]) -> str:
+    return op.get("operationId") or f"{method.lower()}_{path.strip('/').replace('/','_')}"
+
+class OpenAPIIndex:
+    # Parsed view of an OpenAPI document: operationId -> Operation and tag -> operations, built in one pass.
+    # $refs are resolved lazily (one level at a time) with memoization; alias cycles raise ValueError.
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec or {}
+        self.operations: Dict[str, Operation] = {}
+        self.by_tag: Dict[str, List[Operation]] = {}
+        self._pointers: Dict[str, Any] = {}
+        self._build()
+
+    def get(self, operation_id: str) -> Optional[Operation]:
+        return self.operations.get(operation_id)
+
+    def resolve(self, obj: Any) -> Any:
+        # Follows `$ref` until a non-ref object is reached.
+        seen: List[str] = []
+        while isinstance(obj, dict) and isinstance(obj.get("$ref"), str):
+            ref = obj["$ref"]
+            if ref in seen:
+                raise ValueError(f"$ref cycle: {' -> '.join(seen + [ref])}")
+            seen.append(ref)
+            obj = self.pointer(ref)
+        return obj
+
+    def pointer(self, ref: str) -> Any:
+        if ref in self._pointers:
+            return self._pointers[ref]
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $refs are supported: {ref}")
+        cur: Any = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(cur, dict) and part in cur:
+                cur = cur[part]
+            elif isinstance(cur, list) and part.isdigit() and int(part) < len(cur):
+                cur = cur[int(part)]
+            else:
+                raise KeyError(f"Unresolvable $ref: {ref}")
+        self._pointers[ref] = cur
+        return cur
+
+    def _build(self) -> None:
+        for pth, item in (self.spec.get("paths") or {}).items():
+            if not isinstance(item, dict):
+                continue
+            shared_params = item.get("parameters") or []
+            for method, op in item.items():
+                if method.lower() not in HTTP_METHODS:
+                    continue
+                op = op or {}
+                params = self._merge_params(shared_params, op.get("parameters") or [])
+                request_schema = self._json_schema(op.get("requestBody"))
+                if request_schema is None:
+                    # Swagger 2.0: the request body is an `in: body` parameter
+                    body = next((p for p in params if p.get("in") == "body"), None)
+                    request_schema = self._json_schema(body)
+                operation = Operation(
+                    operation_id=operation_id_for(method, pth, op),
+                    method=method.lower(),
+                    path=pth,
+                    summary=op.get("summary") or "",
+                    tags=list(op.get("tags") or ["API"]),
+                    parameters=[p for p in params if p.get("in") != "body"],
+                    request_schema=request_schema,
+                    response_schema=self._response_schema(op.get("responses") or {}),
+                    raw=op,
+                )
+                self.operations.setdefault(operation.operation_id, operation)
+                for tag in operation.tags:
+                    self.by_tag.setdefault(tag, []).append(operation)
+
+    def _merge_params(self, shared: List[Any], own: List[Any]) -> List[Dict[str, Any]]:
+        merged: Dict[Any, Dict[str, Any]] = {}
+        for prm in list(shared) + list(own):
+            prm = self._safe_resolve(prm)
+            if isinstance(prm, dict) and prm.get("name"):
+                merged[(prm.get("name"), prm.get("in"))] = prm
+        return list(merged.values())
+
+    def _json_schema(self, body: Any) -> Optional[Dict[str, Any]]:
+        body = self._safe_resolve(body)
+        if not isinstance(body, dict):
+            return None
+        for ctype, media in (body.get("content") or {}).items():
+            if "json" in ctype and isinstance(media, dict) and isinstance(media.get("schema"), dict):
+                return media["schema"]
+        # Swagger 2.0 style: body parameter / response with a direct schema
+        schema = body.get("schema")
+        return schema if isinstance(schema, dict) else None
+
+    def _response_schema(self, responses: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for code in sorted(responses, key=str):
+            if str(code).startswith("2"):
+                schema = self._json_schema(responses[code])
+                if schema is not None:
+                    return schema
+        return None
+
+    def _safe_resolve(self, obj: Any) -> Any:
+        try:
+            return self.resolve(obj)
+        except (KeyError, ValueError):
+            return None
@@ -1,25 +1,91 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from typing import Any, Dict
-import requests
-import yaml
-
-def load_openapi(path_or_url: str) -> Dict[str, Any]:
-    text = _read_text(path_or_url)
-    # JSON first
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-    # YAML
-    return yaml.safe_load(text)
-
-def _read_text(path_or_url: str) -> str:
-    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
-        r = requests.get(path_or_url, timeout=30)
-        r.raise_for_status()
-        return r.text
-    with open(path_or_url, "r", encoding="utf-8") as f:
+import pickle
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.tools import tracing
+
+def load_openapi(path_or_url: str, cache_dir: Optional[str] = None, http_cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    # With cache_dir, the parsed spec is pickled, one entry per source overwritten whenever the source changes
+    # (keyed by path, mtime and size for files, content hash for URLs).
+    # URLs go through the shared fetch layer; with http_cache_dir an unchanged spec costs one 304 round-trip.
+    with tracing.span("openapi.load", cat="io", source=path_or_url):
+        return _load_openapi(path_or_url, cache_dir, http_cache_dir)
+
+def _load_openapi(path_or_url: str, cache_dir: Optional[str], http_cache_dir: Optional[str]) -> Dict[str, Any]:
+    if _is_url(path_or_url):
+        source = path_or_url
+        raw = _read_bytes(path_or_url, http_cache_dir)
+        key = "url:" + hashlib.sha256(raw).hexdigest()
+    else:
+        source = os.path.abspath(path_or_url)
+        st = os.stat(path_or_url)
+        raw = None
+        key = f"file:{source}:{st.st_mtime_ns}:{st.st_size}"
+
+    cache_path = None
+    if cache_dir:
+        # Named after the source rather than the key, so an edited spec (constant under --watch) replaces its
+        # previous pickle instead of adding another one.
+        cache_path = os.path.join(cache_dir, hashlib.sha256(source.encode("utf-8")).hexdigest() + ".pickle")
+        try:
+            with open(cache_path, "rb") as f:
+                cached_key, spec = pickle.load(f)
+            if cached_key == key:
+                tracing.annotate(spec_cache="hit")
+                return spec
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+            pass
+
+    if raw is None:
+        raw = _read_bytes(path_or_url, http_cache_dir)
+    tracing.annotate(spec_cache="miss" if cache_dir else "off", bytes=len(raw))
+    with tracing.span("openapi.parse", cat="parse", bytes=len(raw)):
+        spec = parse_openapi(raw, path_or_url)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((key, spec), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    return spec
+
+def parse_openapi(raw: bytes, name: str = "") -> Dict[str, Any]:
+    # Pick the parser up front (extension, then first byte) instead of failing through json -> yaml.
+    if _looks_like_json(raw, name):
+        return json.loads(raw)
+    import yaml
+
+    return yaml.load(raw, Loader=_yaml_loader())
+
+@lru_cache(maxsize=None)
+def _yaml_loader():
+    # libyaml-backed loader is an order of magnitude faster on large specs; fall back to pure Python.
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _looks_like_json(raw: bytes, name: str) -> bool:
+    lowered = name.lower().split("?", 1)[0]
+    if lowered.endswith(".json"):
+        return True
+    if lowered.endswith((".yaml", ".yml")):
+        return False
+    head = raw[:64].lstrip(b"\xef\xbb\xbf \t\r\n")
+    return head[:1] in (b"{", b"[")
+
+def _is_url(path_or_url: str) -> bool:
+    return path_or_url.startswith("http://") or path_or_url.startswith("https://")
+
+def _read_bytes(path_or_url: str, http_cache_dir: Optional[str] = None) -> bytes:
+    if _is_url(path_or_url):
+        from app.tools.http_fetch import fetch_bytes
+
+        return fetch_bytes(path_or_url, cache_dir=http_cache_dir)
+    with open(path_or_url, "rb") as f:
         return f.read()
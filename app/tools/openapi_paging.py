@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from app.tools.openapi_index import OpenAPIIndex, Operation
+
+# Query parameter names that identify a paged collection endpoint (compared case-insensitively).
+CURSOR_PARAMS = ("cursor", "after", "page_token", "pagetoken", "starting_after", "continuation", "next_token", "nexttoken")
+OFFSET_PARAMS = ("offset", "skip", "start")
+PAGE_PARAMS = ("page", "page_number", "pagenumber", "page_index", "pageindex")
+SIZE_PARAMS = ("limit", "page_size", "pagesize", "per_page", "perpage", "size", "count", "take", "top", "max_results", "maxresults")
+
+# Response properties holding the rows, the next cursor and the total count.
+ITEMS_KEYS = ("items", "data", "results", "content", "records", "rows", "entries", "values")
+NEXT_CURSOR_KEYS = ("next_cursor", "nextcursor", "next_page_token", "nextpagetoken", "cursor", "next", "after")
+TOTAL_KEYS = ("total", "total_count", "totalcount", "total_items", "totalitems", "totalelements", "count")
+
+def detect_paging(op: Operation, index: OpenAPIIndex) -> Optional[Dict[str, Any]]:
+    # How the generated TableSection should page through a GET operation, from its query parameters and
+    # 2xx response schema. None when the endpoint takes no paging parameters (the table then pages the
+    # fetched rows client-side). The dict is emitted as-is into src/api/paging.ts.
+    if op.method != "get":
+        return None
+    query = {prm["name"].lower(): prm for prm in op.parameters if prm.get("in") == "query"}
+    size = _first(query, SIZE_PARAMS)
+    cursor = _first(query, CURSOR_PARAMS)
+    offset = _first(query, OFFSET_PARAMS)
+    page = _first(query, PAGE_PARAMS)
+
+    paging: Dict[str, Any]
+    if cursor:
+        paging = {"kind": "cursor", "cursorParam": cursor["name"]}
+    elif offset:
+        paging = {"kind": "offset", "offsetParam": offset["name"]}
+    elif page:
+        schema = _resolve(page.get("schema"), index)
+        paging = {"kind": "page", "pageParam": page["name"], "firstPage": 0 if schema.get("minimum") == 0 else 1}
+    else:
+        return None
+    if size:
+        schema = _resolve(size.get("schema"), index)
+        paging["sizeParam"] = size["name"]
+        if isinstance(schema.get("maximum"), int):
+            paging["maxSize"] = schema["maximum"]
+
+    props = _properties(op.response_schema, index)
+    items_key = _first(props, ITEMS_KEYS)
+    if items_key:
+        paging["itemsKey"] = items_key
+    if cursor:
+        next_key = _first(props, NEXT_CURSOR_KEYS)
+        if next_key:
+            paging["nextCursorKey"] = next_key
+    total_key = _first(props, TOTAL_KEYS)
+    if total_key and total_key != items_key:
+        paging["totalKey"] = total_key
+    return paging
+
+def _first(named: Dict[str, Any], candidates: tuple) -> Any:
+    for c in candidates:
+        if c in named:
+            return named[c]
+    return None
+
+def _properties(schema: Optional[Dict[str, Any]], index: OpenAPIIndex) -> Dict[str, str]:
+    # Lower-cased property name -> actual name of an object response (an array response has none).
+    props = _resolve(schema, index).get("properties")
+    return {name.lower(): name for name in props} if isinstance(props, dict) else {}
+
+def _resolve(schema: Any, index: OpenAPIIndex) -> Dict[str, Any]:
+    try:
+        schema = index.resolve(schema)
+    except (KeyError, ValueError):
+        return {}
+    return schema if isinstance(schema, dict) else {}
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Set
+
+from app.tools.openapi_index import HTTP_METHODS, operation_id_for
+
+# Descriptions/summaries longer than this many characters are truncated before they reach the LLM.
+DEFAULT_TEXT_BUDGET = 240
+
+_DROP_KEYS = ("example", "examples", "externalDocs", "xml")
+_NAME_MAPS = ("properties", "paths", "schemas")
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting English + JSON.
+    return (len(text) + 3) // 4
+
+def compact_json(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def reduce_ui_spec_payload(
+    baseline: Dict[str, Any],
+    source_payload: Dict[str, Any],
+    theme: Dict[str, Any],
+    text_budget: int = DEFAULT_TEXT_BUDGET,
+) -> Dict[str, Any]:
+    # Shrinks the ui-spec refinement input so it scales with the size of the UI, not the size of the API.
+    kind = source_payload.get("kind")
+    data = source_payload.get("data") or {}
+    if kind == "openapi":
+        data = reduce_openapi(data, _referenced_operation_ids(baseline), text_budget)
+    elif kind == "figma":
+        data = {k: v for k, v in data.items() if k != "raw"}
+    return {
+        "baseline": baseline,
+        "source_payload": {"kind": kind, "data": data},
+        # The ui-spec only records the theme name; tokens are applied later by the codegen stage.
+        "theme_tokens": {"name": theme.get("name", "OrgTheme")},
+    }
+
+def reduce_openapi(spec: Dict[str, Any], operation_ids: Set[str], text_budget: int = DEFAULT_TEXT_BUDGET) -> Dict[str, Any]:
+    components = (spec.get("components") or {})
+    paths: Dict[str, Any] = {}
+    for pth, ops in (spec.get("paths") or {}).items():
+        if not isinstance(ops, dict):
+            continue
+        for method, op in ops.items():
+            if method.lower() not in HTTP_METHODS or not isinstance(op, dict):
+                continue
+            op_id = operation_id_for(method, pth, op)
+            if operation_ids and op_id not in operation_ids:
+                continue
+            paths.setdefault(pth, {})[method.lower()] = _slim_operation(op, op_id, components)
+
+    # Keep only schemas reachable from the kept operations, with $ref chains collapsed.
+    schemas = components.get("schemas") or {}
+    kept: Dict[str, Any] = {}
+    pending = list(_refs_in(paths))
+    while pending:
+        name = _schema_name(_final_ref(pending.pop(), schemas))
+        if name is None or name in kept or name not in schemas:
+            continue
+        kept[name] = schemas[name]
+        pending.extend(_refs_in(schemas[name]))
+
+    out: Dict[str, Any] = {
+        "openapi": spec.get("openapi") or spec.get("swagger"),
+        "info": {k: (spec.get("info") or {}).get(k) for k in ("title", "version")},
+        "paths": paths,
+    }
+    if kept:
+        out["components"] = {"schemas": kept}
+    return _prune(out, schemas, text_budget)
+
+def _slim_operation(op: Dict[str, Any], op_id: str, components: Dict[str, Any]) -> Dict[str, Any]:
+    slim: Dict[str, Any] = {"operationId": op_id}
+    for k in ("summary", "description", "tags"):
+        if op.get(k):
+            slim[k] = op[k]
+    params = []
+    for prm in op.get("parameters") or []:
+        prm = _deref_component(prm, components, "parameters")
+        if isinstance(prm, dict):
+            params.append({k: prm[k] for k in ("name", "in", "required", "schema") if k in prm})
+    if params:
+        slim["parameters"] = params
+    body = _deref_component(op.get("requestBody"), components, "requestBodies")
+    schema = _json_schema(body)
+    if schema is not None:
+        slim["requestBody"] = schema
+    for code, resp in (op.get("responses") or {}).items():
+        if str(code).startswith("2"):
+            schema = _json_schema(_deref_component(resp, components, "responses"))
+            if schema is not None:
+                slim["response"] = schema
+                break
+    return slim
+
+def _json_schema(obj: Any) -> Any:
+    if not isinstance(obj, dict):
+        return None
+    content = obj.get("content") or {}
+    for ctype, media in content.items():
+        if "json" in ctype and isinstance(media, dict) and "schema" in media:
+            return media["schema"]
+    return obj.get("schema")
+
+def _deref_component(obj: Any, components: Dict[str, Any], section: str) -> Any:
+    seen = set()
+    while isinstance(obj, dict) and isinstance(obj.get("$ref"), str):
+        ref = obj["$ref"]
+        prefix = f"#/components/{section}/"
+        if not ref.startswith(prefix) or ref in seen:
+            break
+        seen.add(ref)
+        obj = (components.get(section) or {}).get(ref[len(prefix):])
+    return obj
+
+def _final_ref(ref: str, schemas: Dict[str, Any]) -> str:
+    # Follows alias schemas (`A: {$ref: B}`) to the schema that actually has a body.
+    seen = set()
+    while ref not in seen:
+        seen.add(ref)
+        target = schemas.get(_schema_name(ref) or "")
+        if isinstance(target, dict) and set(target) == {"$ref"} and isinstance(target["$ref"], str):
+            ref = target["$ref"]
+            continue
+        break
+    return ref
+
+def _schema_name(ref: str) -> Any:
+    prefix = "#/components/schemas/"
+    return ref[len(prefix):] if ref.startswith(prefix) else None
+
+def _refs_in(obj: Any) -> Iterable[str]:
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            ref = cur.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            stack.extend(cur)
+
+def _prune(obj: Any, schemas: Dict[str, Any], text_budget: int, names: bool = False) -> Any:
+    # `names` marks maps keyed by user-chosen names (properties, paths, schemas) whose keys must be kept.
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            if not names and (k in _DROP_KEYS or (isinstance(k, str) and k.startswith("x-"))):
+                continue
+            if not names and k == "$ref" and isinstance(v, str):
+                out[k] = _final_ref(v, schemas)
+            elif not names and k in ("description", "summary") and isinstance(v, str) and len(v) > text_budget:
+                out[k] = v[:text_budget].rstrip() + "…"
+            else:
+                out[k] = _prune(v, schemas, text_budget, names=not names and k in _NAME_MAPS)
+        return out
+    if isinstance(obj, list):
+        return [_prune(v, schemas, text_budget) for v in obj]
+    return obj
+
+def _referenced_operation_ids(ui_spec: Dict[str, Any]) -> Set[str]:
+    ids = set()
+    for pg in ui_spec.get("pages", []) or []:
+        for sec in pg.get("sections") or []:
+            op_id = (sec.get("source") or {}).get("operationId")
+            if op_id and op_id != "__all__":
+                ids.add(op_id)
+    return ids
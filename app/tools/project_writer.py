@@ -1,26 +1,100 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import shutil
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from app.tools.react_templates import template_root_dir, copy_template_dir
+from app.tools import tracing
+from app.tools.react_templates import TemplateSnapshot
 
-def write_react_project(output_dir: str, app_name: str, file_map: Dict[str, str], ui_spec: Dict[str, Any]) -> None:
-    # 1) Copy base Vite template
-    tmpl = template_root_dir()
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-    copy_template_dir(tmpl, output_dir, replacements={"__APP_NAME__": app_name})
+# Records every file the generator owns in the output dir: rel path -> {sha256, size, mtime_ns}.
+MANIFEST_NAME = ".ui-gen-manifest.json"
 
-    # 2) Write generated files
+def write_react_project(
+    output_dir: str,
+    app_name: str,
+    file_map: Dict[str, str],
+    ui_spec: Dict[str, Any],
+    incremental: bool = True,
+    template: Optional[TemplateSnapshot] = None,
+) -> Dict[str, int]:
+    # 1) Base Vite template + generated files + ui-spec.json, all in memory
+    if template is None:
+        template = TemplateSnapshot.load()
+    files = template.render({"__APP_NAME__": app_name})
     for rel_path, content in file_map.items():
+        files[rel_path] = content.encode("utf-8")
+    files["ui-spec.json"] = json.dumps(ui_spec, indent=2).encode("utf-8")
+
+    if not incremental and os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    previous = _read_manifest(output_dir)
+
+    # 2) Write only files whose bytes changed. Untracked files (node_modules, lockfiles, ...) are never touched.
+    stats = {"written": 0, "unchanged": 0, "deleted": 0}
+    manifest: Dict[str, Dict[str, Any]] = {}
+    for rel_path, data in files.items():
+        digest = hashlib.sha256(data).hexdigest()
+        out_path = os.path.join(output_dir, rel_path)
+        if _is_current(out_path, data, digest, previous.get(rel_path)):
+            stats["unchanged"] += 1
+        else:
+            _atomic_write(out_path, data)
+            stats["written"] += 1
+            tracing.count("bytes_written", len(data))
+        st = os.stat(out_path)
+        manifest[rel_path] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    # 3) Remove files we generated last time but no longer emit
+    for rel_path in previous:
+        if rel_path in files:
+            continue
         out_path = os.path.join(output_dir, rel_path)
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        if os.path.isfile(out_path):
+            os.remove(out_path)
+            stats["deleted"] += 1
+            _prune_empty_dirs(os.path.dirname(out_path), output_dir)
+
+    _atomic_write(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    tracing.annotate(**stats)
+    return stats
+
+def _is_current(out_path: str, data: bytes, digest: str, entry: Optional[Dict[str, Any]]) -> bool:
+    try:
+        st = os.stat(out_path)
+    except OSError:
+        return False
+    if st.st_size != len(data):
+        return False
+    # Untouched since our last write: trust the recorded hash instead of re-reading the file.
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return entry.get("sha256") == digest
+    with open(out_path, "rb") as f:
+        return f.read() == data
+
+def _atomic_write(out_path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+
+def _read_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
 
-    # 3) Store ui-spec.json
-    with open(os.path.join(output_dir, "ui-spec.json"), "w", encoding="utf-8") as f:
-        json.dump(ui_spec, f, indent=2)
+def _prune_empty_dirs(path: str, stop: str) -> None:
+    stop = os.path.abspath(stop)
+    path = os.path.abspath(path)
+    while path != stop and path.startswith(stop):
+        try:
+            os.rmdir(path)
+        except OSError:
+            return
+        path = os.path.dirname(path)
@@ -1,28 +1,88 @@
 from __future__ import annotations
 
+import json
 import os
-import shutil
-from typing import Dict, Any, List, Tuple
+import re
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+from app.tools import codegen_templates
+from app.tools.openapi_forms import form_spec
+from app.tools.openapi_index import OpenAPIIndex, Operation
+from app.tools.openapi_paging import detect_paging
+from app.tools.ts_types import TypeScriptTypes, ts_key
+from app.tools.ts_validators import ValidatorCompiler
+
+_TEXT_SUFFIXES = (".ts",".tsx",".json",".md",".html",".css",".mjs",".cjs",".txt",".yml",".yaml")
+
+# Identifiers an operationId must not turn into (operations.ts exports one function per operation).
+_RESERVED = frozenset((
+    "break case catch class const continue debugger default delete do else enum export extends false finally for "
+    "function if import in instanceof new null return super switch this throw true try typeof var void while with "
+    "yield let static implements interface package private protected public await"
+).split())
+
+# The home index paginates past this many cards; the nav gets a filter box past this many groups.
+HOME_PAGE_SIZE = 24
+NAV_FILTER_MIN_GROUPS = 12
 
 def template_root_dir() -> str:
     return os.path.join(os.path.dirname(__file__), "..", "templates", "react_vite_ts")
 
-def copy_template_dir(src: str, dst: str, replacements: Dict[str,str]) -> None:
-    shutil.copytree(src, dst, dirs_exist_ok=True)
-    # Replace tokens in text files
-    for root, _, files in os.walk(dst):
-        for fn in files:
-            if fn.endswith((".ts",".tsx",".json",".md",".html",".css",".mjs",".cjs",".txt",".yml",".yaml")):
+# Placeholders look like __APP_NAME__; each text file is scanned once when the snapshot is loaded.
+_PLACEHOLDER = re.compile(r"__[A-Z][A-Z0-9_]*__")
+
+class TemplateSnapshot:
+    # The template tree read once into memory: relative path -> bytes, plus the placeholders each text
+    # file contains. Rendering touches only files that hold one of the requested placeholders, with a
+    # single regex pass per file; all other files are shared as-is. Reused across batch and watch runs.
+
+    def __init__(self, files: Dict[str, bytes]):
+        self.files = files
+        self.placeholders: Dict[str, FrozenSet[str]] = {}
+        for rel, data in files.items():
+            if rel.endswith(_TEXT_SUFFIXES):
+                found = frozenset(_PLACEHOLDER.findall(data.decode("utf-8")))
+                if found:
+                    self.placeholders[rel] = found
+        self._rendered: Dict[Tuple[Tuple[str, str], ...], Dict[str, bytes]] = {}
+
+    @classmethod
+    def load(cls, src: Optional[str] = None) -> "TemplateSnapshot":
+        src = src or template_root_dir()
+        files: Dict[str, bytes] = {}
+        for root, _, names in os.walk(src):
+            for fn in names:
                 p = os.path.join(root, fn)
-                try:
-                    with open(p, "r", encoding="utf-8") as f:
-                        txt = f.read()
-                    for k,v in replacements.items():
-                        txt = txt.replace(k, v)
-                    with open(p, "w", encoding="utf-8") as f:
-                        f.write(txt)
-                except Exception:
-                    pass
+                with open(p, "rb") as f:
+                    files[os.path.relpath(p, src).replace(os.sep, "/")] = f.read()
+        return cls(files)
+
+    def render(self, replacements: Dict[str, str]) -> Dict[str, bytes]:
+        # Returns a new dict on every call (callers add generated files to it); the bytes are shared.
+        cache_key = tuple(sorted(replacements.items()))
+        rendered = self._rendered.get(cache_key)
+        if rendered is None:
+            rendered = dict(self.files)
+            if replacements:
+                pattern = re.compile("|".join(re.escape(k) for k in sorted(replacements, key=len, reverse=True)))
+                for rel, found in self.placeholders.items():
+                    if not found.isdisjoint(replacements):
+                        text = pattern.sub(lambda m: replacements[m.group(0)], self.files[rel].decode("utf-8"))
+                        rendered[rel] = text.encode("utf-8")
+            self._rendered[cache_key] = rendered
+        return dict(rendered)
+
+    def write_to(self, dst: str, replacements: Dict[str, str]) -> None:
+        # One write per file. Token-free files are copied as bytes rather than hardlinked: generated apps
+        # get edited in place, and a hardlink would write those edits through into the template tree.
+        for rel, data in self.render(replacements).items():
+            out_path = os.path.join(dst, rel)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            with open(out_path, "wb") as f:
+                f.write(data)
+
+def copy_template_dir(src: str, dst: str, replacements: Dict[str,str]) -> None:
+    TemplateSnapshot.load(src).write_to(dst, replacements)
 
 def base_vite_template_files(app_name: str) -> Dict[str,str]:
     # These override/extend the template
@@ -31,116 +91,236 @@ def base_vite_template_files(app_name: str) -> Dict[str,str]:
         "src/styles/app.css": """@import './theme.css';\n\n/* app-level helpers */\n""",
     }
 
-def materialize_routes(ui_spec: Dict[str, Any]) -> Dict[str, str]:
+def materialize_routes(ui_spec: Dict[str, Any], openapi_index: Optional[OpenAPIIndex] = None) -> Dict[str, str]:
     pages = ui_spec.get("pages", []) or []
     routes = []
     page_files: Dict[str,str] = {}
+    fn_names = operation_fn_names(ui_spec)
 
     for pg in pages:
         name = pg.get("name","Page")
         route = pg.get("route","/")
-        comp = _pascal(name) + "Page"
+        comp = page_component_name(pg)
         routes.append((route, comp, name, pg))
-        page_files[f"src/pages/{comp}.tsx"] = _page_component(comp, name, pg)
+        page_files[f"src/pages/{comp}.tsx"] = _page_component(comp, name, pg, fn_names, openapi_index)
 
     # Router + Nav
     page_files["src/router.tsx"] = _router(routes)
-    page_files["src/components/Nav.tsx"] = _nav(routes)
+    page_files["src/components/Nav.tsx"] = _nav(routes, ui_spec.get("appName") or "GeneratedUI")
     page_files["src/pages/HomePage.tsx"] = _home(ui_spec)
+    page_files["vite.config.ts"] = _vite_config(routes)
 
     return page_files
 
-def infer_openapi_operations(ui_spec: Dict[str, Any]) -> Dict[str, str]:
-    # We generate a minimal operations layer. The generator does NOT need the full spec at runtime.
-    # Instead, ui-spec should reference operationIds; you can hand-edit operations later.
-    operations = []
-    pages = ui_spec.get("pages", []) or []
-    for pg in pages:
+def page_component_name(page: Dict[str, Any]) -> str:
+    name = _pascal(page.get("name","Page"))
+    # A TS identifier can't start with a digit ("2FA" -> Page2fa).
+    return "Page" + name if name[:1].isdigit() else name + "Page"
+
+def operation_fn_names(ui_spec: Dict[str, Any]) -> Dict[str, str]:
+    # operationId -> exported function name in src/api/operations.ts, for every openapi section, in page
+    # order. Shared by the operations layer and the pages that import from it.
+    names: Dict[str, str] = {}
+    taken: set = set()
+    for pg in ui_spec.get("pages", []) or []:
         for sec in (pg.get("sections") or []):
             src = (sec.get("source") or {})
-            if src.get("kind") == "openapi":
-                op_id = src.get("operationId")
-                if op_id and op_id not in operations:
-                    operations.append(op_id)
-
-    operations_ts = """import { http } from './http';\n\n// NOTE: These are stubs inferred from ui-spec.\n// Replace with real endpoints if needed.\n\n"""
-    for op in operations:
-        fn = _camel(op)
-        operations_ts += f"export async function {fn}(payload?: unknown) {{\n  // TODO: map operationId '{op}' to a real endpoint\n  return http.request('{{METHOD}}', '/__TODO__', payload);\n}}\n\n"
+            op_id = src.get("operationId") if src.get("kind") == "openapi" else None
+            if op_id and op_id not in names:
+                fn = _camel(op_id) or "operation"
+                if fn[0].isdigit() or fn in _RESERVED:
+                    fn = "op" + fn[:1].upper() + fn[1:]
+                base, n = fn, 2
+                while fn in taken:
+                    fn, n = f"{base}{n}", n + 1
+                taken.add(fn)
+                names[op_id] = fn
+    return names
 
-    types_ts = """// Minimal shared types. Extend per operation.\nexport type ApiResult<T> = { ok: true; data: T } | { ok: false; error: string };\n"""
+def infer_openapi_operations(ui_spec: Dict[str, Any], openapi_index: Optional[OpenAPIIndex] = None) -> Dict[str, str]:
+    # We generate a minimal operations layer. The generator does NOT need the full spec at runtime.
+    # Operations found in the OpenAPI index are bound to their real method/path/parameters and typed from
+    # their schemas (types.ts); anything else is a stub you can hand-edit.
+    types = TypeScriptTypes(openapi_index)
+    validators = ValidatorCompiler(openapi_index)
+    shared_fields: Dict[str, Dict[str, Any]] = {}
+    form_ops = {
+        (sec.get("source") or {}).get("operationId")
+        for pg in ui_spec.get("pages", []) or [] for sec in (pg.get("sections") or []) if sec.get("type") == "form"
+    }
+    ops = []
+    paging = []
+    forms = []
+    for op_id, fn in operation_fn_names(ui_spec).items():
+        op = openapi_index.get(op_id) if openapi_index else None
+        ops.append(_operation_context(fn, op_id, op, types))
+        found = detect_paging(op, openapi_index) if op is not None else None
+        if found:
+            paging.append((op_id, found))
+        if op is not None and op_id in form_ops:
+            forms.append({"name": _form_name(fn), **form_spec(fn, op, openapi_index, validators, shared_fields)})
+    return {
+        "operations_ts": codegen_templates.render(
+            "operations.ts.j2",
+            operations=ops,
+            type_imports=sorted({t for o in ops for t in (o.get("input_type"), o.get("response_type")) if t}),
+        ),
+        "types_ts": codegen_templates.render("types.ts.j2", declarations=types.declarations),
+        "http_ts": codegen_templates.render("http.ts.j2"),
+        "paging_ts": codegen_templates.render("paging.ts.j2", paging=paging),
+        "opmap_ts": codegen_templates.render("opmap.ts.j2", operations=ops),
+        "forms_ts": codegen_templates.render(
+            "forms.ts.j2",
+            forms=forms,
+            shared_fields=list(shared_fields.values()),
+            functions=validators.functions,
+            patterns=validators.patterns,
+        ),
+    }
 
-    http_ts = """export const API_BASE_URL = process.env.VITE_API_BASE_URL || '__API_BASE_URL__';\n\nexport const http = {\n  async request(method: string, path: string, body?: unknown) {\n    const url = API_BASE_URL.replace(/\/$/, '') + path;\n    const init: RequestInit = {\n      method,\n      headers: { 'Content-Type': 'application/json' },\n    };\n    if (body !== undefined) init.body = JSON.stringify(body);\n    const res = await fetch(url, init);\n    const text = await res.text();\n    const json = (() => {\n      try { return JSON.parse(text); } catch { return text; }\n    })();\n    if (!res.ok) throw new Error(typeof json === 'string' ? json : JSON.stringify(json));\n    return json;\n  }\n};\n"""
+def _operation_context(fn: str, op_id: str, op: Optional[Operation], types: TypeScriptTypes) -> Dict[str, Any]:
+    if op is None:
+        return {"fn": fn, "op_id": op_id, "stub": True}
+    type_base = fn[:1].upper() + fn[1:]
+    params = [prm for prm in op.parameters if prm.get("in") in ("path", "query", "header")]
+    names = {where: [prm["name"] for prm in params if prm.get("in") == where] for where in ("path", "query", "header")}
+    path_expr = re.sub(r"\{([^}/]+)\}", lambda m: "${enc(p[" + json.dumps(m.group(1)) + "])}", op.path)
+    url = f"`{path_expr}`"
+    if names["query"]:
+        url += f" + toQuery(p, {json.dumps(names['query'])})"
 
-    return {"operations_ts": operations_ts, "types_ts": types_ts, "http_ts": http_ts}
+    has_body = op.method not in ("get", "delete") and op.request_schema is not None
+    body_required = bool(_resolved(op.raw.get("requestBody"), types.index).get("required"))
+    body_type = types.declare(f"{type_base}Body", op.request_schema) if has_body else None
+    fields = [
+        f"{ts_key(prm['name'])}{'' if prm.get('required') or prm.get('in') == 'path' else '?'}: "
+        f"{types.expr(prm.get('schema') if 'schema' in prm else prm)}"
+        for prm in params
+    ]
 
-def _page_component(comp: str, title: str, page: Dict[str, Any]) -> str:
-    sections = page.get("sections", []) or []
-    sec_blocks = []
-    for i, sec in enumerate(sections):
-        st = sec.get("type","section")
-        t = sec.get("title", f"Section {i+1}")
-        src = sec.get("source", {}) or {}
-        if st == "table":
-            sec_blocks.append(f"""<div className="card">\n  <h2>{t}</h2>\n  <TableSection title={t} operationId="{src.get('operationId','')}" />\n</div>""")
-        elif st == "form":
-            sec_blocks.append(f"""<div className="card">\n  <h2>{t}</h2>\n  <FormSection title={t} operationId="{src.get('operationId','')}" />\n</div>""")
+    body = "undefined"
+    input_type = None
+    if params:
+        param_keys = names["path"] + names["query"] + names["header"]
+        if not has_body:
+            input_type = types.declare_expr(f"{type_base}Params", "{ " + "; ".join(fields) + " }")
+        elif _is_object_schema(op.request_schema, types.index):
+            # Parameters and body properties share the payload; the body is what's left after the parameters.
+            input_type = types.declare_expr(f"{type_base}Params", "{ " + "; ".join(fields) + " } & " + body_type)
+            body = f"omit(p, {json.dumps(param_keys)})"
         else:
-            sec_blocks.append(f"""<div className="card">\n  <h2>{t}</h2>\n  <p style={{ marginTop: 8 }}>This section is a placeholder. Refine it via wireframe or LLM.</p>\n</div>""")
+            fields.append(f"body{'' if body_required else '?'}: {body_type}")
+            input_type = types.declare_expr(f"{type_base}Params", "{ " + "; ".join(fields) + " }")
+            body = "p.body"
+        required = any(prm.get("required") or prm.get("in") == "path" for prm in params) or body_required
+    elif has_body:
+        input_type = body_type
+        body = "payload"
+        required = body_required
+    else:
+        required = False
+
+    response_type = types.declare(f"{type_base}Response", op.response_schema) if op.response_schema is not None else None
+    options = "options"
+    if names["header"]:
+        options = f"{{ ...options, headers: {{ ...headersOf(p, {json.dumps(names['header'])}), ...options?.headers }} }}"
+    return {
+        "fn": fn,
+        "op_id": op_id,
+        "stub": False,
+        "method": op.method.upper(),
+        "path": op.path,
+        "url": url,
+        "body": body,
+        "options": options,
+        "input_type": input_type,
+        "input_optional": not required,
+        "response_type": response_type,
+        "needs_params": bool(params),
+    }
+
+def _is_object_schema(schema: Any, index: Optional[OpenAPIIndex]) -> bool:
+    schema = _resolved(schema, index)
+    return schema.get("type") == "object" or "properties" in schema or "allOf" in schema
+
+def _resolved(obj: Any, index: Optional[OpenAPIIndex]) -> Dict[str, Any]:
+    try:
+        obj = index.resolve(obj) if index is not None else obj
+    except (KeyError, ValueError):
+        return {}
+    return obj if isinstance(obj, dict) else {}
 
-    sec_render = "\n\n".join(sec_blocks) if sec_blocks else "<div className='card'><p>No sections defined.</p></div>"
+def _form_name(fn: str) -> str:
+    # Export name of an operation's FormSpec in src/api/forms.ts.
+    return f"{fn}Form"
+
+def _page_component(
+    comp: str, title: str, page: Dict[str, Any], fn_names: Dict[str, str], openapi_index: Optional[OpenAPIIndex]
+) -> str:
+    sections = []
+    for i, sec in enumerate(page.get("sections", []) or []):
+        src = sec.get("source", {}) or {}
+        sections.append({
+            "type": sec.get("type", "section"),
+            "title": str(sec.get("title", f"Section {i+1}")),
+            "operation_id": src.get("operationId", ""),
+            # Sections bound to an operations.ts function import it directly, so each page chunk only
+            # carries the operations it calls.
+            "fn": fn_names.get(src.get("operationId", "")) if src.get("kind") == "openapi" else None,
+            "content": [str(txt) for txt in sec.get("content") or []],
+            "horizontal": (sec.get("layout") or {}).get("mode") == "HORIZONTAL",
+        })
+    for sec in sections:
+        # Forms exist for operations found in the spec (see infer_openapi_operations).
+        known = sec["fn"] and openapi_index is not None and openapi_index.get(sec["operation_id"]) is not None
+        sec["form"] = _form_name(sec["fn"]) if sec["type"] == "form" and known else None
+    used = sorted({sec["fn"] for sec in sections if sec["fn"] and sec["type"] in ("table", "form")})
+    forms = sorted({sec["form"] for sec in sections if sec["form"]})
+    return codegen_templates.render("page.tsx.j2", comp=comp, title=title, sections=sections, operations=used, forms=forms)
 
-    return f"""import Nav from '../components/Nav';\nimport {{ FormSection }} from '../components/sections/FormSection';\nimport {{ TableSection }} from '../components/sections/TableSection';\n\nexport default function {comp}() {{\n  return (\n    <div className="container">\n      <Nav />\n      <h1>{title}</h1>\n      <div className="grid">\n        {sec_render}\n      </div>\n    </div>\n  );\n}}\n"""
+def _route_context(routes: List[Tuple[str,str,str,Dict[str,Any]]]) -> List[Dict[str, str]]:
+    return [{"route": route, "comp": comp, "name": name} for route, comp, name, _ in routes if route != "/"]
 
 def _router(routes: List[Tuple[str,str,str,Dict[str,Any]]]) -> str:
-    imports = ["import { createBrowserRouter, RouterProvider } from 'react-router-dom';",
-               "import HomePage from './pages/HomePage';"]
-    elems = ["{ path: '/', element: <HomePage /> }"]
-    for route, comp, _, _ in routes:
-        if route == "/":
-            continue
-        imports.append(f"import {comp} from './pages/{comp}';")
-        elems.append(f"{{ path: '{route}', element: <{comp} /> }}")
-
-    return "\n".join(imports) + "\n\n" + "\n".join([
-        "const router = createBrowserRouter([",
-        "  " + ",\n  ".join(elems),
-        "]);",
-        "",
-        "export default function AppRouter(){",
-        "  return <RouterProvider router={router} />;",
-        "}",
-        ""
-    ])
-
-def _nav(routes: List[Tuple[str,str,str,Dict[str,Any]]]) -> str:
-    links = []
-    for route, _, name, _ in routes:
+    return codegen_templates.render("router.tsx.j2", routes=_route_context(routes))
+
+def _nav(routes: List[Tuple[str,str,str,Dict[str,Any]]], app_name: str) -> str:
+    # Pages are grouped by their ui-spec "group" (the OpenAPI tag in full coverage); ungrouped pages stand alone.
+    groups: Dict[str, Dict[str, Any]] = {}
+    for route, _, name, pg in routes:
         if route == "/":
             continue
-        links.append(f"<a className=\"pill\" href=\"{route}\">{name}</a>")
-    links_render = "\n          ".join(links) if links else ""
-    return f"""export default function Nav() {{\n  return (\n    <header className="nav">\n      <div>\n        <strong>__APP_NAME__</strong>\n        <div style={{ color: 'var(--muted)', fontSize: 13, marginTop: 4 }}>Themed UI generated from your spec</div>\n      </div>\n      <nav className="navlinks">\n        <a className="pill active" href="/">Home</a>\n        {links_render}\n      </nav>\n    </header>\n  );\n}}\n"""
+        key = pg.get("group") or name
+        groups.setdefault(key, {"name": key, "links": []})["links"].append({"name": name, "route": route})
+    return codegen_templates.render(
+        "nav.tsx.j2",
+        groups=list(groups.values()),
+        app_name=app_name,
+        filterable=len(groups) > NAV_FILTER_MIN_GROUPS,
+    )
+
+def _vite_config(routes: List[Tuple[str,str,str,Dict[str,Any]]]) -> str:
+    # Pages of a group with several pages (an OpenAPI tag in full coverage) are bundled into one chunk:
+    # moving between a tag's sub-pages then loads nothing new.
+    by_group: Dict[str, List[str]] = {}
+    for route, comp, _, pg in routes:
+        if route != "/" and pg.get("group"):
+            by_group.setdefault(pg["group"], []).append(comp)
+    page_chunks = [(comp, f"pages-{_clean(group)}") for group, comps in by_group.items() if len(comps) > 1 for comp in comps]
+    return codegen_templates.render("vite.config.ts.j2", page_chunks=page_chunks)
 
 def _home(ui_spec: Dict[str, Any]) -> str:
     pages = ui_spec.get("pages", []) or []
-    cards = []
-    for pg in pages[:8]:
-        route = pg.get("route","/")
-        name = pg.get("name","Page")
-        if route == "/":
-            continue
-        cards.append(f"""<a className="card" href="{route}" style={{ textDecoration: 'none' }}>\n  <h2 style={{ marginTop: 0 }}>{name}</h2>\n  <p style={{ color: 'var(--muted)' }}>Go to {route}</p>\n</a>""")
-    cards_render = "\n\n".join(cards) if cards else "<div className='card'><p>No pages inferred.</p></div>"
-
-    return f"""import Nav from '../components/Nav';\n\nexport default function HomePage() {{\n  return (\n    <div className="container">\n      <Nav />\n      <h1>Home</h1>\n      <p style={{ color: 'var(--muted)' }}>Generated routes based on your OpenAPI / wireframe / Figma input.</p>\n      <div className="grid two">\n        {cards_render}\n      </div>\n    </div>\n  );\n}}\n"""
+    routes = [{"name": pg.get("name", "Page"), "route": pg.get("route", "/")} for pg in pages]
+    return codegen_templates.render("home.tsx.j2", routes=[r for r in routes if r["route"] != "/"], page_size=HOME_PAGE_SIZE)
 
 def _pascal(s: str) -> str:
     parts = [p for p in _clean(s).split('-') if p]
     return ''.join(p[:1].upper() + p[1:] for p in parts) or "Page"
 
 def _camel(s: str) -> str:
-    p = _pascal(s)
+    parts = [p for p in re.split(r"[^a-zA-Z0-9]+", s or "") if p]
+    p = ''.join(p[:1].upper() + p[1:] for p in parts)
     return p[:1].lower() + p[1:]
 
 def _clean(s: str) -> str:
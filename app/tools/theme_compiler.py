@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from app.tools import codegen_templates
+
+# org-theme.json -> theme.css. Design tokens may be nested to any depth, in plain form
+# ({"colors": {"primary": "#3b82f6"}}) or W3C/Style Dictionary form ({"primary": {"$value": "#3b82f6"}}),
+# and may reference each other ("{colors.primary}"). Every token becomes a CSS variable with its
+# references resolved here, once. theme.css.j2 maps the tokens the stylesheet relies on to its own variable
+# names (token()) and emits the rest as --<path> variables (remaining_tokens()). Rules whose classes no
+# generated file uses are dropped and the result is minified; compiled output is kept per theme hash.
+
+_REFERENCE = re.compile(r"\{([^{}]+)\}")
+_STRING = re.compile(r"""'([^'\\\n]*(?:\\.[^'\\\n]*)*)'|"([^"\\\n]*(?:\\.[^"\\\n]*)*)"|`([^`]*)`""")
+_CLASS = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_NON_IDENT = re.compile(r"[^a-zA-Z0-9_-]+")
+SOURCE_SUFFIXES = (".tsx", ".ts", ".jsx", ".js", ".html")
+
+# Classes applied by libraries rather than written in the app's source (react-router's NavLink).
+RUNTIME_CLASSES = frozenset({"active", "pending"})
+MAX_CACHED = 64
+
+_lock = threading.Lock()
+_compiled: "OrderedDict[str, str]" = OrderedDict()
+_scanned: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+
+def compile_theme_css(
+    theme: Dict[str, Any], used_classes: Optional[FrozenSet[str]] = None, classes_key: Optional[str] = None
+) -> str:
+    # used_classes=None keeps every rule (no generated files to check against). classes_key, when given,
+    # identifies used_classes in the cache key (the sources digest from used_classes_of) instead of the set.
+    tokens = theme.get("tokens", {}) if isinstance(theme, dict) else {}
+    if classes_key is None and used_classes is not None:
+        classes_key = json.dumps(sorted(used_classes))
+    key = hashlib.sha256(json.dumps(
+        [tokens, classes_key, codegen_templates.overrides_fingerprint()], sort_keys=True, default=str,
+    ).encode("utf-8")).hexdigest()
+    with _lock:
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key]
+
+    flat = flatten_tokens(tokens if isinstance(tokens, dict) else {})
+    consumed: set = set()
+
+    def token(path: str, default: str) -> str:
+        consumed.add(path)
+        return flat.get(path, default)
+
+    def remaining_tokens() -> List[Tuple[str, str]]:
+        return [(_var_name(path), value) for path, value in flat.items() if path not in consumed]
+
+    css = codegen_templates.render("theme.css.j2", token=token, remaining_tokens=remaining_tokens)
+    css = "/* Generated from org-theme.json */\n" + minify_css(prune_css(css, used_classes)) + "\n"
+    with _lock:
+        _compiled[key] = css
+        while len(_compiled) > MAX_CACHED:
+            _compiled.popitem(last=False)
+    return css
+
+def flatten_tokens(tokens: Dict[str, Any]) -> Dict[str, str]:
+    # Dotted token path -> CSS value, with every "{path}" reference resolved.
+    raw: Dict[str, Any] = {}
+    _collect(tokens, [], raw)
+    resolved: Dict[str, str] = {}
+    for path in raw:
+        _resolve(path, raw, resolved, [])
+    return resolved
+
+def _collect(node: Any, path: List[str], out: Dict[str, Any]) -> None:
+    if isinstance(node, dict) and ("$value" in node or "value" in node):
+        value = node.get("$value", node.get("value"))
+        if isinstance(value, dict) and {"offsetX", "offsetY"} <= set(value):
+            value = " ".join(str(value[k]) for k in ("offsetX", "offsetY", "blur", "spread", "color") if k in value)
+        if isinstance(value, dict):
+            _collect(value, path, out)
+        else:
+            out[".".join(path)] = value
+        return
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if not str(k).startswith("$"):
+                _collect(v, path + [str(k)], out)
+    elif isinstance(node, list):
+        if node and all(isinstance(x, (str, int, float)) and not isinstance(x, bool) for x in node):
+            out[".".join(path)] = ", ".join(str(x) for x in node)
+    elif isinstance(node, (str, int, float)) and not isinstance(node, bool) and path:
+        out[".".join(path)] = node
+
+def _resolve(path: str, raw: Dict[str, Any], resolved: Dict[str, str], stack: List[str]) -> str:
+    if path in resolved:
+        return resolved[path]
+    if path in stack:
+        raise ValueError(f"Theme token reference cycle: {' -> '.join(stack + [path])}")
+    if path not in raw:
+        raise ValueError(f"Theme token {stack[-1]!r} references unknown token {{{path}}}")
+    value = raw[path]
+    if isinstance(value, list):
+        value = ", ".join(str(x) for x in value)
+    value = _REFERENCE.sub(lambda m: _resolve(m.group(1).strip(), raw, resolved, stack + [path]), str(value))
+    if any(c in value for c in ";{}"):
+        raise ValueError(f"Theme token {path!r} is not a valid CSS value: {value!r}")
+    resolved[path] = value
+    return value
+
+def _var_name(path: str) -> str:
+    return "--" + "-".join(p for p in map(_kebab, path.split(".")) if p)
+
+@lru_cache(maxsize=4096)
+def _kebab(part: str) -> str:
+    # Token path segments repeat heavily (shade names, "surface", ...): convert each once.
+    return _NON_IDENT.sub("-", _CAMEL.sub(r"\1-\2", part)).strip("-").lower()
+
+def used_classes_of(files: Dict[str, Any]) -> Tuple[str, FrozenSet[str]]:
+    # (digest, classes) of the source files in a generated file map, template tree included. Hashing the
+    # sources is far cheaper than scanning them, so the scan runs once per distinct set of sources.
+    h = hashlib.sha256()
+    sources = []
+    for path in sorted(files):
+        if path.endswith(SOURCE_SUFFIXES):
+            content = files[path]
+            h.update(path.encode("utf-8") + b"\0")
+            h.update((content if isinstance(content, bytes) else str(content).encode("utf-8")) + b"\0")
+            sources.append(content)
+    key = h.hexdigest()
+    with _lock:
+        if key in _scanned:
+            _scanned.move_to_end(key)
+            return key, _scanned[key]
+    found = class_names(sources) | template_class_names()
+    with _lock:
+        _scanned[key] = found
+        while len(_scanned) > MAX_CACHED:
+            _scanned.popitem(last=False)
+    return key, found
+
+def class_names(sources: Iterable[Any]) -> FrozenSet[str]:
+    # Every whitespace-separated word inside a string literal: a superset of the class names the sources
+    # apply (classes assembled at runtime from fragments are not seen).
+    found = set()
+    for src in sources:
+        text = src.decode("utf-8", "replace") if isinstance(src, bytes) else str(src)
+        for m in _STRING.finditer(text):
+            found.update((m.group(1) or m.group(2) or m.group(3) or "").split())
+    return frozenset(found)
+
+@lru_cache(maxsize=None)
+def template_class_names() -> FrozenSet[str]:
+    # Classes used by the React template tree (sections, layout), which every generated app includes.
+    from app.tools.react_templates import template_root_dir
+
+    sources = []
+    for root, _, names in os.walk(template_root_dir()):
+        for fn in names:
+            if fn.endswith(SOURCE_SUFFIXES):
+                with open(os.path.join(root, fn), "r", encoding="utf-8") as f:
+                    sources.append(f.read())
+    return class_names(sources)
+
+def prune_css(css: str, used_classes: Optional[FrozenSet[str]]) -> str:
+    # Drops rules none of whose selectors can match: a selector is live when all its classes are used.
+    css = _COMMENT.sub("", css)
+    if used_classes is None:
+        return css
+    used = used_classes | RUNTIME_CLASSES
+    out: List[str] = []
+    for prelude, body in _blocks(css):
+        if prelude.startswith("@"):
+            inner = prune_css(body, used_classes) if prelude.startswith(("@media", "@supports")) else body
+            if inner.strip():
+                out.append(f"{prelude} {{{inner}}}")
+            continue
+        selectors = [s for s in prelude.split(",") if set(_CLASS.findall(s)) <= used]
+        if selectors:
+            out.append(f"{','.join(selectors)} {{{body}}}")
+    return "\n".join(out)
+
+def minify_css(css: str) -> str:
+    out: List[str] = []
+    for prelude, body in _blocks(_COMMENT.sub("", css)):
+        prelude = re.sub(r"\s*([,>+~])\s*", r"\1", " ".join(prelude.split()))
+        if prelude.startswith(("@media", "@supports")):
+            out.append(f"{prelude}{{{minify_css(body)}}}")
+            continue
+        decls = []
+        for decl in body.split(";"):
+            name, sep, value = decl.partition(":")
+            if sep and name.strip():
+                value = re.sub(r"\s*,\s*", ",", " ".join(value.split()))
+                decls.append(f"{name.strip()}:{value}")
+        if decls:
+            out.append(f"{prelude}{{{';'.join(decls)}}}")
+    return "".join(out)
+
+def _blocks(css: str) -> List[Tuple[str, str]]:
+    # Top-level (prelude, body) pairs; bodies keep their nested blocks (for @media and friends).
+    blocks = []
+    depth, start, body_start = 0, 0, 0
+    prelude = ""
+    for i, ch in enumerate(css):
+        if ch == "{":
+            if depth == 0:
+                prelude, body_start = css[start:i].strip(), i + 1
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[body_start:i]))
+                start = i + 1
+    return blocks
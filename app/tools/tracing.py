@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Process-wide tracer. None means tracing is off: span() returns a shared no-op object and the
+# annotate/count helpers return after a single global read, so instrumented code pays almost nothing.
+_tracer: Optional["Tracer"] = None
+_local = threading.local()
+
+class Tracer:
+    # Collects complete ("X") events in Chrome trace format (chrome://tracing, Perfetto, speedscope)
+    # plus run-wide counters (LLM tokens, bytes written, cache hits/misses).
+
+    def __init__(self, cprofile: bool = False):
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self.totals: Dict[str, float] = {}
+        self.cprofile = cprofile
+        self._profiles: List[Any] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self.t0) * 1e6
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        tid = threading.get_ident()
+        event["pid"] = self.pid
+        event["tid"] = tid
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            self.events.append(event)
+
+    def add(self, key: str, n: float) -> None:
+        with self._lock:
+            self.totals[key] = self.totals.get(key, 0) + n
+
+    def profile_call(self, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+        # cProfile only sees the thread it was enabled on, so each stage gets its own profiler and the
+        # results are merged in dump_cprofile(). If another profiler is already active (nested stage, or
+        # interpreters where profiling is process-wide) the call simply runs unprofiled.
+        if not self.cprofile:
+            return fn(**kwargs)
+        import cProfile
+
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            return fn(**kwargs)
+        try:
+            return fn(**kwargs)
+        finally:
+            prof.disable()
+            with self._lock:
+                self._profiles.append(prof)
+
+    def write_chrome_trace(self, path: str) -> None:
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.items()
+        ]
+        doc = {
+            "traceEvents": meta + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"totals": self.totals},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, default=str)
+
+    def dump_cprofile(self, path: str) -> bool:
+        if not self._profiles:
+            return False
+        import pstats
+
+        stats = pstats.Stats(self._profiles[0])
+        for prof in self._profiles[1:]:
+            stats.add(prof)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        stats.dump_stats(path)
+        return True
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0.0
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+    def __enter__(self) -> "_Span":
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = self.tracer._now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end = self.tracer._now_us()
+        _local.stack.pop()
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._emit({
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": round(self.start, 1),
+            "dur": round(end - self.start, 1),
+            "args": self.args,
+        })
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def enable(cprofile: bool = False) -> Tracer:
+    global _tracer
+    _tracer = Tracer(cprofile=cprofile)
+    return _tracer
+
+def disable() -> Optional[Tracer]:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def enabled() -> bool:
+    return _tracer is not None
+
+def span(name: str, cat: str = "app", **args: Any):
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+def annotate(**args: Any) -> None:
+    # Attach values to the innermost open span on this thread.
+    if _tracer is None:
+        return
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].args.update(args)
+
+def count(key: str, n: float = 1) -> None:
+    # Add to the innermost span's `key` and to the run-wide total of the same name.
+    tracer = _tracer
+    if tracer is None:
+        return
+    stack = getattr(_local, "stack", None)
+    if stack:
+        args = stack[-1].args
+        args[key] = args.get(key, 0) + n
+    tracer.add(key, n)
+
+def record_llm_usage(message: Any) -> None:
+    # LangChain messages/chunks carry usage_metadata when the provider reports it.
+    if _tracer is None:
+        return
+    usage = getattr(message, "usage_metadata", None)
+    if isinstance(usage, dict):
+        for key in ("input_tokens", "output_tokens"):
+            if usage.get(key):
+                count(f"llm.{key}", usage[key])
+
+def profile_call(fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    tracer = _tracer
+    if tracer is None:
+        return fn(**kwargs)
+    return tracer.profile_call(fn, kwargs)
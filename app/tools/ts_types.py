@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from app.tools.openapi_index import OpenAPIIndex
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_$][A-Za-z0-9_$]*$")
+# Past this depth inline schemas collapse to `unknown`; named ($ref) schemas are emitted once and referenced.
+MAX_INLINE_DEPTH = 8
+
+class TypeScriptTypes:
+    # Collects TypeScript declarations for the schemas an app's operations use. A $ref'd schema becomes
+    # one named `export type` no matter how many operations refer to it (recursive schemas included);
+    # inline schemas are emitted as type expressions at the point of use.
+
+    def __init__(self, index: Optional[OpenAPIIndex]):
+        self.index = index
+        self.declarations: List[str] = []
+        self._names: Dict[str, str] = {}
+        self._taken: Set[str] = set()
+
+    def declare(self, name: str, schema: Any) -> str:
+        # A named alias for an operation's params/body/response; returns the (deduplicated) type name.
+        name = self._unique(name)
+        self.declarations.append(f"export type {name} = {self.expr(schema)};")
+        return name
+
+    def declare_expr(self, name: str, expr: str) -> str:
+        name = self._unique(name)
+        self.declarations.append(f"export type {name} = {expr};")
+        return name
+
+    def expr(self, schema: Any, depth: int = 0) -> str:
+        if not isinstance(schema, dict) or depth > MAX_INLINE_DEPTH:
+            return "unknown"
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            return self._named(ref)
+        t = self._expr(schema, depth)
+        if schema.get("nullable") and t != "unknown":
+            t = f"{t} | null"
+        return t
+
+    def render(self) -> str:
+        return "\n\n".join(self.declarations)
+
+    def _expr(self, schema: Dict[str, Any], depth: int) -> str:
+        if "enum" in schema and isinstance(schema["enum"], list) and schema["enum"]:
+            return " | ".join(json.dumps(v) for v in schema["enum"])
+        if "const" in schema:
+            return json.dumps(schema["const"])
+        for key, sep in (("oneOf", " | "), ("anyOf", " | "), ("allOf", " & ")):
+            parts = schema.get(key)
+            if isinstance(parts, list) and parts:
+                return sep.join(_paren(self.expr(p, depth + 1)) for p in parts)
+        t = schema.get("type")
+        if isinstance(t, list):
+            return " | ".join(self._expr({**schema, "type": x}, depth) for x in t) or "unknown"
+        if t == "string":
+            return "Blob" if schema.get("format") == "binary" else "string"
+        if t in ("integer", "number"):
+            return "number"
+        if t == "boolean":
+            return "boolean"
+        if t == "null":
+            return "null"
+        if t == "array" or "items" in schema:
+            return f"{_paren(self.expr(schema.get('items'), depth + 1))}[]"
+        if t == "object" or "properties" in schema or "additionalProperties" in schema:
+            return self._object(schema, depth)
+        return "unknown"
+
+    def _object(self, schema: Dict[str, Any], depth: int) -> str:
+        props = schema.get("properties") if isinstance(schema.get("properties"), dict) else {}
+        required = set(schema.get("required") or [])
+        fields = [f"{ts_key(name)}{'' if name in required else '?'}: {self.expr(sub, depth + 1)}" for name, sub in props.items()]
+        extra = schema.get("additionalProperties")
+        if extra is True or isinstance(extra, dict):
+            fields.append(f"[key: string]: {self.expr(extra, depth + 1) if isinstance(extra, dict) else 'unknown'}")
+        if not fields:
+            return "Record<string, unknown>"
+        return "{ " + "; ".join(fields) + " }"
+
+    def _named(self, ref: str) -> str:
+        name = self._names.get(ref)
+        if name is not None:
+            return name
+        name = self._unique(ts_type_name(ref.rsplit("/", 1)[-1]))
+        # Registered before the body is built, so a schema that refers to itself resolves to its own name.
+        self._names[ref] = name
+        try:
+            target = self.index.pointer(ref) if self.index else None
+        except (KeyError, ValueError):
+            target = None
+        self.declarations.append(f"export type {name} = {self.expr(target)};")
+        return name
+
+    def _unique(self, name: str) -> str:
+        candidate, n = name, 2
+        while candidate in self._taken:
+            candidate, n = f"{name}{n}", n + 1
+        self._taken.add(candidate)
+        return candidate
+
+def ts_type_name(raw: str) -> str:
+    raw = raw.replace("~1", "/").replace("~0", "~")
+    name = "".join(p[:1].upper() + p[1:] for p in re.split(r"[^A-Za-z0-9]+", raw) if p)
+    if not name or name[0].isdigit():
+        name = "T" + name
+    return name
+
+def ts_key(name: str) -> str:
+    return name if _IDENTIFIER.match(name) else json.dumps(name)
+
+def _paren(t: str) -> str:
+    return f"({t})" if (" | " in t or " & " in t) else t
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from app.tools.openapi_index import OpenAPIIndex
+from app.tools.ts_types import ts_type_name
+
+# Past this depth nested inline schemas are not checked; named ($ref) schemas get one function each.
+MAX_INLINE_DEPTH = 8
+
+# String formats with a cheap check; other formats are accepted as plain strings.
+FORMAT_CHECKS = {
+    "email": "!EMAIL.test({v})",
+    "uuid": "!UUID.test({v})",
+    "date": "!DATE.test({v})",
+    "date-time": "Number.isNaN(Date.parse({v}))",
+    "uri": "!isUrl({v})",
+}
+
+class ValidatorCompiler:
+    # Compiles JSON schemas into TypeScript validator functions at generation time, so the app ships plain
+    # `typeof`/comparison checks rather than a schema interpreter. Every function has the signature
+    # `(v: unknown, path: string, e: FormErrors) => void` and records the first problem per path in `e`;
+    # the helpers it calls (at, fail, passes, isObj, the format regexes) live in forms.ts.j2.
+
+    def __init__(self, index: Optional[OpenAPIIndex]):
+        self.index = index
+        self.functions: List[str] = []
+        self.patterns: List[str] = []
+        self._names: Dict[str, str] = {}
+        self._compiled: Dict[str, str] = {}
+        self._taken: Set[str] = set()
+        self._vars = 0
+
+    def compile(self, name: str, schema: Any) -> str:
+        # Declares a validator for `schema` and returns its name. Operations with the same parameters and
+        # body (common across a resource's create/update endpoints) share one function.
+        key = json.dumps(schema, sort_keys=True, default=str)
+        if key in self._compiled:
+            return self._compiled[key]
+        name = self._compiled[key] = self._unique(f"validate{name}")
+        self._declare(name, schema)
+        return name
+
+    def _declare(self, name: str, schema: Any) -> None:
+        body = self._check(schema, "v", "path", 0)
+        lines = [f"function {name}(v: unknown, path: string, e: FormErrors): void {{"]
+        lines += [f"  {ln}" for ln in body]
+        lines.append("}")
+        self.functions.append("\n".join(lines))
+
+    def _named(self, ref: str) -> str:
+        name = self._names.get(ref)
+        if name is not None:
+            return name
+        name = self._unique(f"validate{ts_type_name(ref.rsplit('/', 1)[-1])}")
+        # Registered before the body is compiled, so a recursive schema calls its own function.
+        self._names[ref] = name
+        try:
+            target = self.index.pointer(ref) if self.index else None
+        except (KeyError, ValueError):
+            target = None
+        self._declare(name, target)
+        return name
+
+    def _check(self, schema: Any, v: str, path: str, depth: int) -> List[str]:
+        # Statements validating the value in `v` (at the path in `path`); [] when nothing can be checked.
+        if not isinstance(schema, dict) or depth > MAX_INLINE_DEPTH:
+            return []
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            return [f"{self._named(ref)}({v}, {path}, e);"]
+
+        out: List[str] = []
+        for sub in schema.get("allOf") or []:
+            out += self._check(sub, v, path, depth + 1)
+        for key, test in (("anyOf", "!{fs}.some((f) => passes(f, {v}, {p}))"),
+                          ("oneOf", "{fs}.filter((f) => passes(f, {v}, {p})).length !== 1")):
+            alts = schema.get(key)
+            if isinstance(alts, list) and alts:
+                fs = "[" + ", ".join(self._alternative(alt) for alt in alts) + "]"
+                out.append(f"if ({test.format(fs=fs, v=v, p=path)}) fail(e, {path}, \"does not match the allowed shapes\");")
+
+        chain = self._chain(schema, v, path, depth)
+        types = schema.get("type") if isinstance(schema.get("type"), list) else [schema.get("type")]
+        if chain and (schema.get("nullable") or "null" in types):
+            out += [f"if ({v} !== null) {{"] + [f"  {ln}" for ln in chain] + ["}"]
+        else:
+            out += chain
+        return out
+
+    def _alternative(self, schema: Any) -> str:
+        if isinstance(schema, dict) and isinstance(schema.get("$ref"), str):
+            return self._named(schema["$ref"])
+        name = self._unique("validateAlt")
+        self._declare(name, schema)
+        return name
+
+    def _chain(self, schema: Dict[str, Any], v: str, path: str, depth: int) -> List[str]:
+        # One if / else-if chain: a type test first, so the later conditions see a narrowed `v`.
+        conds: List[tuple] = []
+        if isinstance(schema.get("enum"), list) and schema["enum"]:
+            conds.append((f"!({json.dumps(schema['enum'])} as unknown[]).includes({v})",
+                          "must be one of: " + ", ".join(str(x) for x in schema["enum"])[:120]))
+        if "const" in schema:
+            conds.append((f"{v} !== {json.dumps(schema['const'])}", f"must be {json.dumps(schema['const'])}"))
+
+        t = schema.get("type")
+        if isinstance(t, list):
+            t = next((x for x in t if x != "null"), None) if len([x for x in t if x != "null"]) == 1 else None
+        tail: List[str] = []
+        if t == "string":
+            conds.append((f"typeof {v} !== 'string'", "must be a string"))
+            if isinstance(schema.get("minLength"), int) and schema["minLength"] > 0:
+                n = schema["minLength"]
+                conds.append((f"{v}.length < {n}", "is required" if n == 1 else f"must be at least {n} characters"))
+            if isinstance(schema.get("maxLength"), int):
+                conds.append((f"{v}.length > {schema['maxLength']}", f"must be at most {schema['maxLength']} characters"))
+            pattern = self._pattern(schema.get("pattern"))
+            if pattern:
+                conds.append((f"!matchesPattern({pattern}, {v})", "has an invalid format"))
+            fmt = FORMAT_CHECKS.get(schema.get("format"))
+            if fmt:
+                conds.append((fmt.format(v=v), f"must be a valid {schema['format']}"))
+        elif t in ("integer", "number"):
+            conds.append((f"typeof {v} !== 'number' || !Number.isFinite({v})", "must be a number"))
+            if t == "integer":
+                conds.append((f"!Number.isInteger({v})", "must be a whole number"))
+            conds += _bounds(schema, v)
+            if isinstance(schema.get("multipleOf"), (int, float)) and schema["multipleOf"] > 0:
+                m = schema["multipleOf"]
+                conds.append((f"Math.abs({v} / {m} - Math.round({v} / {m})) > 1e-9", f"must be a multiple of {m}"))
+        elif t == "boolean":
+            conds.append((f"typeof {v} !== 'boolean'", "must be true or false"))
+        elif t == "null":
+            conds.append((f"{v} !== null", "must be empty"))
+        elif t == "array" or (t is None and "items" in schema):
+            conds.append((f"!Array.isArray({v})", "must be a list"))
+            if isinstance(schema.get("minItems"), int) and schema["minItems"] > 0:
+                conds.append((f"{v}.length < {schema['minItems']}", f"must have at least {schema['minItems']} item(s)"))
+            if isinstance(schema.get("maxItems"), int):
+                conds.append((f"{v}.length > {schema['maxItems']}", f"must have at most {schema['maxItems']} item(s)"))
+            item = self._var()
+            idx = self._var()
+            items = self._check(schema.get("items"), item, f"at({path}, {idx})", depth + 1)
+            if items:
+                tail = [f"{v}.forEach(({item}, {idx}) => {{"] + [f"  {ln}" for ln in items] + ["});"]
+        elif t == "object" or (t is None and ("properties" in schema or "required" in schema)):
+            conds.append((f"!isObj({v})", "must be an object"))
+            tail = self._properties(schema, v, path, depth)
+
+        if not conds:
+            return tail
+        lines = []
+        for i, (cond, message) in enumerate(conds):
+            lines.append(f"{'if' if i == 0 else 'else if'} ({cond}) fail(e, {path}, {json.dumps(message)});")
+        if tail:
+            lines.append("else {")
+            lines += [f"  {ln}" for ln in tail]
+            lines.append("}")
+        return lines
+
+    def _properties(self, schema: Dict[str, Any], v: str, path: str, depth: int) -> List[str]:
+        props = schema.get("properties") if isinstance(schema.get("properties"), dict) else {}
+        required = [name for name in schema.get("required") or [] if isinstance(name, str)]
+        out: List[str] = []
+        for name in dict.fromkeys(list(props) + required):
+            x = self._var()
+            key = json.dumps(name)
+            checks = self._check(props.get(name), x, f"at({path}, {key})", depth + 1)
+            if name not in required and not checks:
+                continue
+            out.append(f"const {x} = {v}[{key}];")
+            if name in required:
+                out.append(f"if ({x} === undefined) fail(e, at({path}, {key}), \"is required\");")
+            if checks:
+                out.append(f"{'else' if name in required else f'if ({x} !== undefined)'} {{")
+                out += [f"  {ln}" for ln in checks]
+                out.append("}")
+        if schema.get("additionalProperties") is False:
+            allowed = json.dumps(list(props))
+            k = self._var()
+            out.append(f"for (const {k} of Object.keys({v})) if (!{allowed}.includes({k})) fail(e, at({path}, {k}), \"is not an allowed field\");")
+        return out
+
+    def _pattern(self, pattern: Any) -> Optional[str]:
+        # Index into forms.ts's PATTERNS. They are ECMA-262 regexes, so they are compiled by the browser (lazily,
+        # see matchesPattern) rather than checked with Python's `re`, whose syntax differs.
+        if not isinstance(pattern, str):
+            return None
+        if pattern not in self.patterns:
+            self.patterns.append(pattern)
+        return str(self.patterns.index(pattern))
+
+    def _var(self) -> str:
+        self._vars += 1
+        return f"x{self._vars}"
+
+    def _unique(self, name: str) -> str:
+        candidate, n = name, 2
+        while candidate in self._taken:
+            candidate, n = f"{name}{n}", n + 1
+        self._taken.add(candidate)
+        return candidate
+
+def _bounds(schema: Dict[str, Any], v: str) -> List[tuple]:
+    # OpenAPI 3.0 flags exclusiveMinimum/Maximum as booleans next to minimum/maximum; 3.1 gives the bound.
+    conds = []
+    for key, exclusive, op, strict, word in (("minimum", "exclusiveMinimum", "<", "<=", "at least"),
+                                             ("maximum", "exclusiveMaximum", ">", ">=", "at most")):
+        bound, excl = schema.get(key), schema.get(exclusive)
+        if isinstance(excl, (int, float)) and not isinstance(excl, bool):
+            conds.append((f"{v} {strict} {excl}", f"must be {'greater' if op == '<' else 'less'} than {excl}"))
+        elif isinstance(bound, (int, float)) and not isinstance(bound, bool):
+            if excl is True:
+                conds.append((f"{v} {strict} {bound}", f"must be {'greater' if op == '<' else 'less'} than {bound}"))
+            else:
+                conds.append((f"{v} {op} {bound}", f"must be {word} {bound}"))
+    return conds
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import yaml
+
+from app.tools.openapi_loader import load_openapi
+from benchmarks.synthetic import synthetic_openapi
+
+# python -m benchmarks.bench_openapi_load --tags 40 --ops 40
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tags", type=int, default=40)
+    ap.add_argument("--ops", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench-openapi-")
+    try:
+        spec_path = os.path.join(work, "spec.yaml")
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        with open(spec_path, "w", encoding="utf-8") as f:
+            yaml.dump(synthetic_openapi(args.tags, args.ops), f, Dumper=dumper, sort_keys=False)
+        size_mb = os.path.getsize(spec_path) / 1e6
+        cache_dir = os.path.join(work, "cache")
+
+        with open(spec_path, "rb") as f:
+            raw = f.read()
+        pure = _best_of(lambda: yaml.load(raw, Loader=yaml.SafeLoader), args.repeat)
+        fast = _best_of(lambda: load_openapi(spec_path), args.repeat)
+        load_openapi(spec_path, cache_dir=cache_dir)  # warm the parsed-spec cache
+        cached = _best_of(lambda: load_openapi(spec_path, cache_dir=cache_dir), args.repeat)
+
+        print(f"spec: {args.tags} tags x {args.ops} ops, {size_mb:.1f} MB YAML (libyaml: {hasattr(yaml, 'CSafeLoader')})")
+        print(f"  yaml.safe_load (pure Python): {pure * 1000:9.1f} ms")
+        print(f"  load_openapi (no cache):      {fast * 1000:9.1f} ms  ({pure / fast:5.1f}x)")
+        print(f"  load_openapi (cached):        {cached * 1000:9.1f} ms  ({pure / cached:5.1f}x)")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# python -m benchmarks.bench_startup                  # exit 1 if over budget or a heavy module leaks in
+# python -m benchmarks.bench_startup --budget-ms 80 --top 15
+
+# Modules an offline CLI start (LLM_PROVIDER=none, local spec/wireframe) must not import.
+HEAVY_MODULES = ("requests", "yaml", "ijson", "jinja2", "langchain_core", "langchain_openai", "langchain_anthropic")
+
+ENTRY = "import app.main, app.agents.orchestrator, app.agents.batch"
+
+def importtime(code: str) -> Dict[str, int]:
+    # Cumulative microseconds per top-level module, from `python -X importtime` (stderr).
+    env = dict(os.environ, LLM_PROVIDER="none")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    out: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        name = name.strip()
+        if name == "site":
+            # Children are printed before their parent: everything so far was interpreter startup.
+            out.clear()
+            continue
+        try:
+            out[name] = int(cumulative.strip())
+        except ValueError:
+            continue
+    return out
+
+def main() -> int:
+    ap = argparse.ArgumentParser(prog="benchmarks.bench_startup")
+    ap.add_argument("--budget-ms", type=float, default=150.0, help="Max cumulative import time of the CLI modules")
+    ap.add_argument("--repeat", type=int, default=5, help="Take the best of N interpreter starts")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    runs = [importtime(ENTRY) for _ in range(max(1, args.repeat))]
+    roots = ("app.main", "app.agents.orchestrator", "app.agents.batch")
+    totals = [sum(r.get(m, 0) for m in roots) for r in runs]
+    best = runs[totals.index(min(totals))]
+    best_ms = min(totals) / 1000
+
+    print(f"CLI import time: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms, best of {len(runs)})")
+    for name, us in sorted(best.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures: List[str] = []
+    leaked = sorted(m for m in HEAVY_MODULES if m in best)
+    if leaked:
+        failures.append(f"heavy module(s) imported at startup: {', '.join(leaked)}")
+    if best_ms > args.budget_ms:
+        failures.append(f"import time {best_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+    for f in failures:
+        print(f"FAIL {f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
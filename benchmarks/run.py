@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.agents.react_codegen_agent import _theme_css, generate_react_app
+from app.agents.ui_spec_agent import _baseline_ui_spec
+from app.prompts.load_prompts import load_prompt_bundle
+from app.tools.openapi_index import OpenAPIIndex
+from app.tools.project_writer import write_react_project
+from app.tools.react_templates import TemplateSnapshot, copy_template_dir, infer_openapi_operations, materialize_routes, template_root_dir
+from benchmarks.synthetic import FakeLLM, synthetic_openapi, synthetic_theme, synthetic_wireframe
+
+# python -m benchmarks.run --output bench.json
+# python -m benchmarks.run --compare bench.json        # exit 1 if a stage regressed past --threshold
+
+# Differences below this are treated as noise regardless of the ratio.
+NOISE_FLOOR_S = 0.005
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    # Separate traced run: tracemalloc slows execution, so it must not affect the timing.
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    out = {"seconds": round(best, 6), "peak_kb": round(peak / 1024, 1)}
+    if isinstance(result, dict) and result and all(isinstance(v, str) for v in result.values()):
+        # Generated file maps: also report how much code the stage emits.
+        out["files"] = len(result)
+        out["output_kb"] = round(sum(len(v.encode("utf-8")) for v in result.values()) / 1024, 1)
+    return out
+
+def _vary(theme: Dict[str, Any], n: int) -> Dict[str, Any]:
+    return {**theme, "tokens": {**theme["tokens"], "bench": {"run": str(n)}}}
+
+def build_stages(args: argparse.Namespace, work: str) -> List[Tuple[str, Callable[[], Any]]]:
+    spec = synthetic_openapi(args.tags, args.ops, args.depth)
+    theme = synthetic_theme()
+    wireframe = synthetic_wireframe(args.pages)
+    prompts = load_prompt_bundle()
+    source = {"kind": "openapi", "data": spec}
+    index = OpenAPIIndex(spec)
+    ui_spec = _baseline_ui_spec(source, theme, "Bench", openapi_index=index)
+    file_map = generate_react_app(None, prompts, ui_spec, theme, "Bench", "http://localhost:8080", False, openapi_index=index)
+    # Full coverage of a large API (--full-ops operations): every tag and operation gets a page section.
+    full_spec = synthetic_openapi(args.tags, max(1, -(-args.full_ops // args.tags)), args.depth)
+    full_source = {"kind": "openapi", "data": full_spec}
+    full_index = OpenAPIIndex(full_spec)
+    full_ui_spec = _baseline_ui_spec(full_source, theme, "Bench", openapi_index=full_index, coverage="full")
+    out_dir = os.path.join(work, "app")
+    write_react_project(out_dir, "Bench", file_map, ui_spec)
+
+    snapshot = TemplateSnapshot.load()
+    names = itertools.count()
+    large_theme = synthetic_theme(palette=args.palette)
+
+    def _copy_template():
+        dst = os.path.join(work, "tmpl")
+        shutil.rmtree(dst, ignore_errors=True)
+        copy_template_dir(template_root_dir(), dst, {"__APP_NAME__": "Bench"})
+
+    def _write_fresh():
+        dst = os.path.join(work, "fresh")
+        shutil.rmtree(dst, ignore_errors=True)
+        write_react_project(dst, "Bench", file_map, ui_spec)
+
+    return [
+        ("openapi_index", lambda: OpenAPIIndex(spec)),
+        ("baseline_ui_spec.openapi", lambda: _baseline_ui_spec(source, theme, "Bench", openapi_index=index)),
+        ("baseline_ui_spec.wireframe", lambda: _baseline_ui_spec({"kind": "wireframe", "data": wireframe}, theme, "Bench")),
+        ("baseline_ui_spec.full", lambda: _baseline_ui_spec(full_source, theme, "Bench", openapi_index=full_index, coverage="full")),
+        ("materialize_routes", lambda: materialize_routes(ui_spec, index)),
+        ("materialize_routes.full", lambda: materialize_routes(full_ui_spec, full_index)),
+        ("materialize_routes.wireframe", lambda: materialize_routes({"pages": wireframe["pages"]})),
+        ("infer_openapi_operations", lambda: infer_openapi_operations(ui_spec, index)),
+        # A fresh token per call, so these measure compilation rather than the per-theme-hash cache.
+        ("theme_css", lambda: _theme_css(_vary(theme, next(names)), file_map)),
+        ("theme_css.large_tokens", lambda: _theme_css(_vary(large_theme, next(names)), file_map)),
+        ("theme_css.cached", lambda: _theme_css(theme, file_map)),
+        ("copy_template_dir", _copy_template),
+        ("template_snapshot.load", TemplateSnapshot.load),
+        ("template_snapshot.render", lambda: snapshot.render({"__APP_NAME__": f"Bench{next(names)}"})),
+        ("write_react_project.fresh", _write_fresh),
+        ("write_react_project.unchanged", lambda: write_react_project(out_dir, "Bench", file_map, ui_spec)),
+        ("generate_react_app.offline", lambda: generate_react_app(None, prompts, ui_spec, theme, "Bench", "http://x", False, openapi_index=index)),
+        ("generate_react_app.offline.full", lambda: generate_react_app(None, prompts, full_ui_spec, theme, "Bench", "http://x", False, openapi_index=full_index)),
+        ("generate_react_app.fake_llm", lambda: generate_react_app(FakeLLM(), prompts, ui_spec, theme, "Bench", "http://x", False, openapi_index=index)),
+    ]
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, cur in report["stages"].items():
+        base = (baseline.get("stages") or {}).get(name)
+        if not base:
+            continue
+        ratio = cur["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        slower = cur["seconds"] - base["seconds"] > NOISE_FLOOR_S and ratio > threshold
+        mem_ratio = cur["peak_kb"] / base["peak_kb"] if base["peak_kb"] else 1.0
+        out_ratio = cur["output_kb"] / base["output_kb"] if base.get("output_kb") and "output_kb" in cur else 1.0
+        if slower or mem_ratio > threshold or out_ratio > threshold:
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> {cur['seconds']:.4f}s ({ratio:.2f}x), "
+                               f"{base['peak_kb']:.0f} KB -> {cur['peak_kb']:.0f} KB ({mem_ratio:.2f}x)"
+                               + (f", output {out_ratio:.2f}x" if out_ratio != 1.0 else ""))
+    return regressions
+
+def main() -> int:
+    ap = argparse.ArgumentParser(prog="benchmarks.run")
+    ap.add_argument("--tags", type=int, default=20)
+    ap.add_argument("--ops", type=int, default=20, help="Operations per tag")
+    ap.add_argument("--depth", type=int, default=3, help="Nested schema depth")
+    ap.add_argument("--pages", type=int, default=50, help="Wireframe pages")
+    ap.add_argument("--full-ops", type=int, default=1200, help="Operations in the spec for the full-coverage (*.full) stages")
+    ap.add_argument("--palette", type=int, default=200, help="Hues (x10 shades) in the design-token file of theme_css.large_tokens")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", help="Comma-separated stage names to run")
+    ap.add_argument("--output", help="Write the JSON report here")
+    ap.add_argument("--compare", help="Baseline JSON report to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="Flag stages slower/larger than baseline by this ratio")
+    args = ap.parse_args()
+
+    work = tempfile.mkdtemp(prefix="ui-gen-bench-")
+    try:
+        stages = build_stages(args, work)
+        only = set(args.only.split(",")) if args.only else None
+        results: Dict[str, Dict[str, float]] = {}
+        for name, fn in stages:
+            if only and name not in only:
+                continue
+            results[name] = _measure(fn, args.repeat)
+            r = results[name]
+            size = f"  {r['files']:5d} files {r['output_kb']:9.1f} KB out" if "output_kb" in r else ""
+            print(f"{name:<32} {r['seconds'] * 1000:10.2f} ms  {r['peak_kb']:10.1f} KB peak{size}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {k: getattr(args, k) for k in ("tags", "ops", "depth", "pages", "full_ops", "palette", "repeat")},
+        },
+        "stages": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("params") != report["meta"]["params"]:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        if regressions:
+            return 1
+        print(f"No regressions vs {args.compare} (threshold {args.threshold:.2f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+# Synthetic inputs for benchmarking the generator without real specs or an LLM.
+
+def synthetic_openapi(tags: int = 20, ops_per_tag: int = 20, schema_depth: int = 3, fields: int = 8) -> Dict[str, Any]:
+    # N tags x M operations over a chain of nested component schemas `depth` levels deep.
+    schemas: Dict[str, Any] = {}
+    paths: Dict[str, Any] = {}
+    for t in range(tags):
+        tag = f"Resource{t}"
+        for level in range(schema_depth):
+            name = f"{tag}L{level}"
+            props: Dict[str, Any] = {
+                f"field{f}": {"type": "string", "description": f"Field {f} of {name}. " * 4, "example": f"value-{f}"}
+                for f in range(fields)
+            }
+            if level + 1 < schema_depth:
+                props["child"] = {"$ref": f"#/components/schemas/{tag}L{level + 1}"}
+            schemas[name] = {"type": "object", "required": ["field0"], "properties": props}
+        schemas[f"{tag}List"] = {"type": "array", "items": {"$ref": f"#/components/schemas/{tag}L0"}}
+        for o in range(ops_per_tag):
+            base = f"/{tag.lower()}/group{o // 4}"
+            method = ("get", "post", "put", "delete")[o % 4]
+            path = base if method in ("get", "post") else f"{base}/{{id}}"
+            op: Dict[str, Any] = {
+                "tags": [tag],
+                "operationId": f"{method}{tag}Op{o}",
+                "summary": f"{method.upper()} {tag} #{o}",
+                "description": "Long operation description. " * 20,
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+                ],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{tag}List"}}},
+                    }
+                },
+            }
+            if "{id}" in path:
+                op["parameters"].append({"name": "id", "in": "path", "required": True, "schema": {"type": "string"}})
+            if method in ("post", "put"):
+                op["requestBody"] = {"content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{tag}L0"}}}}
+            paths.setdefault(path, {})[method] = op
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+def synthetic_wireframe(pages: int = 50, sections_per_page: int = 4) -> Dict[str, Any]:
+    return {
+        "appName": "SyntheticWireframe",
+        "pages": [
+            {
+                "name": f"Page {p}",
+                "route": f"/page-{p}",
+                "sections": [
+                    {
+                        "type": "table" if s % 2 == 0 else "form",
+                        "title": f"Section {s}",
+                        "source": {"kind": "openapi", "operationId": f"op{p}x{s}"},
+                    }
+                    for s in range(sections_per_page)
+                ],
+            }
+            for p in range(pages)
+        ],
+    }
+
+def synthetic_theme(palette: int = 0, shades: int = 10) -> Dict[str, Any]:
+    # With palette > 0, adds a W3C-style nested palette (palette x shades colors) and semantic tokens that
+    # alias into it, the shape of a large org design-token file.
+    theme: Dict[str, Any] = {
+        "name": "Synthetic Theme",
+        "tokens": {
+            "colors": {"primary": "#3b82f6", "background": "#0b1220", "text": "#e5e7eb"},
+            "typography": {"fontFamily": "Inter, system-ui", "baseSize": "16px"},
+            "radius": {"sm": "8px", "md": "12px", "lg": "16px"},
+            "spacing": {"2": "8px", "3": "12px", "4": "16px", "6": "24px"},
+        },
+    }
+    if palette:
+        tokens = theme["tokens"]
+        tokens["palette"] = {
+            f"hue{h}": {str(s * 100): {"$type": "color", "$value": f"#{h % 256:02x}{s * 20 % 256:02x}80"} for s in range(1, shades + 1)}
+            for h in range(palette)
+        }
+        tokens["semantic"] = {
+            f"hue{h}": {"surface": {"$value": f"{{palette.hue{h}.100}}"}, "border": {"$value": f"{{semantic.hue{h}.surface}}"}}
+            for h in range(palette)
+        }
+        tokens["colors"]["primary"] = "{semantic.hue0.border}"
+    return theme
+
+class FakeLLM:
+    # Offline stand-in for a chat model: echoes each codegen unit's current file back, optionally after
+    # a fixed latency, so the LLM code paths (prompt building, streaming, parsing) can be timed.
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def invoke(self, messages):
+        import json
+        import time
+
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        body = messages[-1]["content"].split("# INPUT (JSON)", 1)[-1]
+        try:
+            req = json.loads(body)
+        except ValueError:
+            req = {}
+        if "target_file" in req:
+            content = req.get("current_content") or "export default function Empty() { return null; }\n"
+        elif "baseline" in req:
+            content = json.dumps(req["baseline"])
+        else:
+            content = "{}"
+        return _Message(content)
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.tools import http_fetch
+from app.tools.http_fetch import fetch, fetch_bytes
+
+class Handler(BaseHTTPRequestHandler):
+    # Serves the server's scripted responses in order; the last one repeats.
+    def do_GET(self):
+        server = self.server
+        server.requests.append({"path": self.path, "headers": dict(self.headers)})
+        status, headers, body = server.script(self) if callable(server.script) else server.script[
+            min(len(server.requests), len(server.script)) - 1
+        ]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.script = [(200, {}, b"ok")]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(time, "sleep", slept.append)
+    return slept
+
+def test_conditional_get_serves_cached_body_on_304(server, tmp_path):
+    def script(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"'}, b'{"openapi": "3.0.0"}'
+    server.script = script
+
+    first = fetch(server.url + "/spec.json", cache_dir=str(tmp_path))
+    second = fetch(server.url + "/spec.json", cache_dir=str(tmp_path))
+
+    assert (first.status, first.from_cache) == (200, False)
+    assert (second.status, second.from_cache) == (304, True)
+    assert second.read_bytes() == b'{"openapi": "3.0.0"}'
+    assert server.requests[1]["headers"].get("If-None-Match") == '"v1"'
+
+def test_cache_evicts_old_and_least_recently_used_entries(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(http_fetch, "EVICT_EVERY", 1)
+    monkeypatch.setattr(http_fetch, "MAX_CACHE_AGE_S", 3600)
+    server.script = lambda handler: (200, {"ETag": '"x"'}, b"x" * 100)
+    cache = str(tmp_path)
+
+    def bodies():
+        return sorted(fn for fn in os.listdir(cache) if fn.endswith(".body"))
+
+    a = fetch(server.url + "/a", cache_dir=cache).path
+    old = time.time() - 7200
+    os.utime(a, (old, old))
+    fetch(server.url + "/b", cache_dir=cache)
+    assert not os.path.exists(a)
+    assert len(bodies()) == 1
+
+    # Room for two entries: the third write drops the least recently used one.
+    entry = sum(os.path.getsize(os.path.join(cache, fn)) for fn in os.listdir(cache))
+    monkeypatch.setattr(http_fetch, "MAX_CACHE_BYTES", 2 * entry + entry // 2)
+    b = os.path.join(cache, bodies()[0])
+    os.utime(b, (time.time() - 60, time.time() - 60))
+    c = fetch(server.url + "/c", cache_dir=cache).path
+    d = fetch(server.url + "/d", cache_dir=cache).path
+    assert not os.path.exists(b)
+    assert os.path.exists(c) and os.path.exists(d)
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_in_seconds(server, sleeps, status):
+    server.script = [(status, {"Retry-After": "3"}, b""), (200, {}, b"done")]
+
+    assert fetch_bytes(server.url + "/x", retries=2) == b"done"
+    assert sleeps == [3.0]
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_as_http_date(server, sleeps, status):
+    when = formatdate(time.time() + 10, usegmt=True)
+    server.script = [(status, {"Retry-After": when}, b""), (200, {}, b"done")]
+
+    assert fetch_bytes(server.url + "/x", retries=2) == b"done"
+    assert len(sleeps) == 1
+    assert 8 <= sleeps[0] <= 10
+
+def test_gives_up_after_configured_retries(server, sleeps):
+    server.script = [(503, {}, b"unavailable")]
+
+    with pytest.raises(requests.HTTPError):
+        fetch(server.url + "/x", retries=2, backoff_s=0.5)
+    assert len(server.requests) == 3
+    assert len(sleeps) == 2
+    assert all(0 <= s <= http_fetch.MAX_BACKOFF_S for s in sleeps)
@@ -0,0 +1,117 @@
+import os
+import time
+
+from app.llm import cache as llm_cache
+from app.llm.cache import CachedLLM, LLMCache, commit_reply
+from benchmarks.synthetic import FakeLLM
+
+def _messages(prompt: str):
+    return [{"role": "system", "content": "system"}, {"role": "user", "content": prompt}]
+
+class Chunk:
+    def __init__(self, content):
+        self.content = content
+
+class StreamingFakeLLM(FakeLLM):
+    def stream(self, messages):
+        content = self.invoke(messages).content
+        for i in range(0, len(content), 3):
+            yield Chunk(content[i:i + 3])
+
+def test_hit_after_commit_and_miss_on_other_prompt_or_model(tmp_path):
+    fake = FakeLLM()
+    cache = LLMCache(str(tmp_path))
+    llm = CachedLLM(fake, cache, provider="p", model="m1")
+
+    first = llm.invoke(_messages("a"))
+    commit_reply(llm, _messages("a"))
+    again = llm.invoke(_messages("a"))
+    assert again.content == first.content
+    assert fake.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    llm.invoke(_messages("b"))
+    CachedLLM(fake, cache, provider="p", model="m2").invoke(_messages("a"))
+    assert fake.calls == 3
+
+def test_reply_is_not_persisted_until_committed(tmp_path):
+    fake = FakeLLM()
+    llm = CachedLLM(fake, LLMCache(str(tmp_path)), provider="p", model="m")
+
+    llm.invoke(_messages("a"))
+    llm.invoke(_messages("a"))
+    assert fake.calls == 2
+
+    commit_reply(llm, _messages("a"))
+    # A fresh process (new wrapper, same directory) replays the committed reply.
+    CachedLLM(fake, LLMCache(str(tmp_path)), provider="p", model="m").invoke(_messages("a"))
+    assert fake.calls == 2
+
+def test_commit_reply_ignores_uncached_models():
+    commit_reply(FakeLLM(), _messages("a"))
+
+def test_empty_reply_is_not_cached(tmp_path):
+    class EmptyLLM(FakeLLM):
+        def invoke(self, messages):
+            self.calls += 1
+            return Chunk("")
+
+    fake = EmptyLLM()
+    llm = CachedLLM(fake, LLMCache(str(tmp_path)), provider="p", model="m")
+    llm.invoke(_messages("a"))
+    commit_reply(llm, _messages("a"))
+    llm.invoke(_messages("a"))
+    assert fake.calls == 2
+
+def test_stream_and_invoke_share_one_entry(tmp_path):
+    fake = StreamingFakeLLM()
+    llm = CachedLLM(fake, LLMCache(str(tmp_path)), provider="p", model="m")
+
+    streamed = "".join(chunk.content for chunk in llm.stream(_messages("a")))
+    commit_reply(llm, _messages("a"))
+    assert llm.invoke(_messages("a")).content == streamed
+    assert fake.calls == 1
+
+    invoked = llm.invoke(_messages("b")).content
+    commit_reply(llm, _messages("b"))
+    assert [chunk.content for chunk in llm.stream(_messages("b"))] == [invoked]
+    assert fake.calls == 2
+
+def test_eviction_runs_every_evict_every_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "EVICT_EVERY", 3)
+    cache = LLMCache(str(tmp_path), max_age_s=3600)
+    walks = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: (walks.append(1), evict()))
+
+    cache.put("a" * 64, "first")  # the first write measures the directory
+    assert len(walks) == 1
+    old = time.time() - 7200
+    os.utime(cache._path("a" * 64), (old, old))
+
+    cache.put("b" * 64, "second")
+    cache.put("c" * 64, "third")
+    assert len(walks) == 1
+    assert os.path.exists(cache._path("a" * 64))
+
+    cache.put("d" * 64, "fourth")
+    assert len(walks) == 2
+    assert not os.path.exists(cache._path("a" * 64))
+    assert cache.get("d" * 64) == "fourth"
+
+def test_eviction_drops_least_recently_used_past_max_bytes(tmp_path):
+    cache = LLMCache(str(tmp_path))
+    keys = [c * 64 for c in "abc"]
+    for i, key in enumerate(keys):
+        cache.put(key, "x" * 100)
+        t = time.time() - 100 + i
+        os.utime(cache._path(key), (t, t))
+    cache.get(keys[0])  # touched: now the most recently used
+    entry = os.path.getsize(cache._path(keys[0]))
+    cache.max_bytes = 2 * entry
+
+    cache.evict()
+
+    assert os.path.exists(cache._path(keys[0]))
+    assert not os.path.exists(cache._path(keys[1]))
+    assert os.path.exists(cache._path(keys[2]))